@@ -170,7 +170,8 @@ SELECT
       ELSE 0.0
     END as wasted_budget_risk
 FROM `generative-ai-418805.budget_alert.meta_campaign_snapshots` c
-WHERE DATE(snapshot_timestamp) = CURRENT_DATE()
+WHERE c.snapshot_timestamp >= TIMESTAMP(CURRENT_DATE())
+  AND c.snapshot_timestamp < TIMESTAMP(DATE_ADD(CURRENT_DATE(), INTERVAL 1 DAY))
   AND c.campaign_status = 'ACTIVE'
   AND c.delivery_status IN ('NO_ACTIVE_ADSETS', 'NO_ADS', 'ADS_PAUSED')
 ORDER BY wasted_budget_risk DESC;
@@ -473,7 +473,8 @@ FROM `generative-ai-418805.budget_alert.meta_campaign_snapshots` c
 LEFT JOIN `generative-ai-418805.budget_alert.meta_delivery_diagnostics` d
     ON c.campaign_id = d.campaign_id
     AND DATE(c.snapshot_timestamp) = DATE(d.checked_at)
-WHERE DATE(c.snapshot_timestamp) = CURRENT_DATE()
+WHERE c.snapshot_timestamp >= TIMESTAMP(CURRENT_DATE())
+    AND c.snapshot_timestamp < TIMESTAMP(DATE_ADD(CURRENT_DATE(), INTERVAL 1 DAY))
     AND c.campaign_status = 'ACTIVE'
     AND c.can_deliver = FALSE
     AND c.budget_amount > 500
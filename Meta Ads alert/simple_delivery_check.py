@@ -90,7 +90,8 @@ SELECT
     END as issue_severity,
     budget_amount * CASE WHEN budget_type = 'daily' THEN 30 ELSE 1 END as monthly_budget_at_risk
 FROM `generative-ai-418805.budget_alert.meta_campaign_snapshots`
-WHERE DATE(snapshot_timestamp) = CURRENT_DATE()
+WHERE snapshot_timestamp >= TIMESTAMP(CURRENT_DATE())
+    AND snapshot_timestamp < TIMESTAMP(DATE_ADD(CURRENT_DATE(), INTERVAL 1 DAY))
     AND campaign_status = 'ACTIVE'
     AND delivery_status_simple NOT LIKE '🟢%'
     AND budget_amount > 1000
@@ -162,6 +163,7 @@ SELECT
         ELSE 0 
     END) as daily_budget_at_risk
 FROM `generative-ai-418805.budget_alert.meta_campaign_snapshots`
-WHERE DATE(snapshot_timestamp) = CURRENT_DATE()
+WHERE snapshot_timestamp >= TIMESTAMP(CURRENT_DATE())
+    AND snapshot_timestamp < TIMESTAMP(DATE_ADD(CURRENT_DATE(), INTERVAL 1 DAY))
     AND campaign_status = 'ACTIVE'
 """
\ No newline at end of file
@@ -33,6 +33,7 @@ CREATE TABLE IF NOT EXISTS `generative-ai-418805.budget_alert.meta_campaign_snap
   optimization_goal STRING
 )
 PARTITION BY DATE(snapshot_timestamp)
+CLUSTER BY account_name, campaign_id
 OPTIONS(
   description="Hourly snapshots of campaign budgets for change detection"
 );
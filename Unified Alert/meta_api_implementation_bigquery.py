@@ -12,6 +12,7 @@ Table Naming Convention:
 
 import os
 import json
+import time
 import uuid
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
@@ -19,11 +20,40 @@ from decimal import Decimal
 from google.cloud import bigquery
 from google.cloud import secretmanager
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from facebook_business.api import FacebookAdsApi
 from facebook_business.adobjects.business import Business
 from facebook_business.adobjects.adaccount import AdAccount
 from facebook_business.adobjects.campaign import Campaign
 from facebook_business.adobjects.adset import AdSet
+from facebook_business.exceptions import FacebookRequestError
+
+# Active account lists change on human timescales, so keep them per process
+# (keyed by business_id) instead of asking the Graph API on every cycle
+ACTIVE_ACCOUNTS_CACHE_TTL_SECONDS = int(os.getenv('ACTIVE_ACCOUNTS_CACHE_TTL_SECONDS', 900))
+_active_accounts_cache: Dict[str, tuple] = {}
+
+# Integer severity stored next to delivery_status_simple, keyed by the status emoji,
+# so readers can filter zombies without matching multi-byte emoji prefixes.
+# 0 = delivering, 1 = unknown / not started / check failed, 2 = no active ads,
+# 3 = all ad sets paused, 4 = no ad sets
+DELIVERY_SEVERITY = {'🟢': 0, '❓': 1, '⏰': 1, '❌': 1, '🟡': 2, '🟠': 3, '🔴': 4}
+
+# Snapshot table columns, read once per process (keyed by table ID). delivery_severity is
+# only written once add_delivery_columns.sql has added the column - streaming inserts
+# reject every row that carries an unknown field
+_table_columns_cache: Dict[str, frozenset] = {}
+
+
+def _build_http_adapter() -> HTTPAdapter:
+    """Pooled HTTPS adapter with retries for the webhook session"""
+    return HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(total=2, backoff_factor=0.2)
+    )
+
 
 class MetaBudgetMonitorBQ:
     def __init__(self, business_id: str, project_id: str, dataset_id: str = "budget_alert"):
@@ -39,6 +69,13 @@ class MetaBudgetMonitorBQ:
         self.project_id = project_id
         self.dataset_id = dataset_id
         
+        # Reuse one HTTP session so alerts don't pay a TLS handshake every cycle
+        self._http = requests.Session()
+        self._http.mount('https://', _build_http_adapter())
+        
+        # alert_sent UPDATEs run in the background and are drained before the cycle returns
+        self._pending_jobs: List[bigquery.QueryJob] = []
+        
         # Initialize BigQuery client
         self.bq_client = bigquery.Client(project=project_id)
         
@@ -126,15 +163,11 @@ class MetaBudgetMonitorBQ:
             return None
         try:
             # Parse Meta's timestamp format: 2025-07-08T17:05:44-0700
-            from datetime import datetime
-            import re
-            
-            # Remove timezone offset for parsing
-            clean_timestamp = re.sub(r'[+-]\d{4}$', '', timestamp_str)
-            dt = datetime.strptime(clean_timestamp, '%Y-%m-%dT%H:%M:%S')
+            # (offset dropped by slicing the fixed-width local time, as in _parse_meta_timestamp_to_datetime)
+            dt = datetime.fromisoformat(timestamp_str[:19])
             
             # Return in BigQuery format
-            return dt.strftime('%Y-%m-%d %H:%M:%S')
+            return dt.isoformat(sep=' ')
         except Exception as e:
             print(f"Error parsing timestamp {timestamp_str}: {e}")
             return None
@@ -145,11 +178,9 @@ class MetaBudgetMonitorBQ:
             return None
         try:
             # Parse Meta's timestamp format: 2025-07-08T17:05:44-0700
-            import re
-            
-            # Remove timezone offset for parsing
-            clean_timestamp = re.sub(r'[+-]\d{4}$', '', timestamp_str)
-            return datetime.strptime(clean_timestamp, '%Y-%m-%dT%H:%M:%S')
+            # The fixed-width local time is the first 19 characters; dropping the offset by slicing and
+            # parsing with fromisoformat avoids a regex and strptime's format matching per timestamp
+            return datetime.fromisoformat(timestamp_str[:19])
         except Exception as e:
             print(f"Error parsing timestamp to datetime {timestamp_str}: {e}")
             return None
@@ -393,6 +424,14 @@ class MetaBudgetMonitorBQ:
             # Clean up temp table on error
             self.bq_client.delete_table(temp_table_id, not_found_ok=True)
     
+    def _get_table_columns(self, table_id: str) -> frozenset:
+        """Get a table's column names (cached per process)"""
+        columns = _table_columns_cache.get(table_id)
+        if columns is None:
+            columns = frozenset(field.name for field in self.bq_client.get_table(table_id).schema)
+            _table_columns_cache[table_id] = columns
+        return columns
+    
     def insert_campaign_snapshots(self, snapshots: List[Dict]):
         """Insert campaign snapshots into BigQuery"""
         if not snapshots:
@@ -404,6 +443,11 @@ class MetaBudgetMonitorBQ:
         prepared_snapshots = [self._prepare_for_bigquery(s) for s in snapshots]
         
         try:
+            if 'delivery_severity' not in self._get_table_columns(table_id):
+                print("⚠️ meta_campaign_snapshots has no delivery_severity column - run add_delivery_columns.sql")
+                for snapshot in prepared_snapshots:
+                    snapshot.pop('delivery_severity', None)
+            
             errors = self.bq_client.insert_rows_json(table_id, prepared_snapshots)
             if errors:
                 print(f"Error inserting campaign snapshots: {errors}")
@@ -412,10 +456,14 @@ class MetaBudgetMonitorBQ:
         except Exception as e:
             print(f"Error inserting campaign snapshots: {e}")
     
-    def insert_anomalies(self, anomalies: List[Dict]):
-        """Insert detected anomalies into BigQuery"""
+    def insert_anomalies(self, anomalies: List[Dict]) -> bool:
+        """Insert detected anomalies into BigQuery with a single load job
+        
+        Returns:
+            True if the anomalies were written (or there were none), False if the load failed
+        """
         if not anomalies:
-            return
+            return True
             
         table_id = f"{self.project_id}.{self.dataset_id}.meta_anomalies"
         
@@ -427,17 +475,32 @@ class MetaBudgetMonitorBQ:
             anomaly['acknowledged'] = False
             anomaly['false_positive'] = False
         
+        # Convert Decimals to floats
+        prepared_anomalies = [self._prepare_for_bigquery(a) for a in anomalies]
+        
         try:
-            errors = self.bq_client.insert_rows_json(table_id, anomalies)
-            if errors:
-                print(f"Error inserting anomalies: {errors}")
-            else:
-                print(f"✅ Inserted {len(anomalies)} anomalies")
+            # A load job instead of streaming inserts; with autodetect off the rows are
+            # appended against the existing table's schema without fetching it first
+            job_config = bigquery.LoadJobConfig(
+                autodetect=False,
+                source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON,
+                write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+            )
+            job = self.bq_client.load_table_from_json(prepared_anomalies, table_id, job_config=job_config)
+            job.result()  # Wait for job to complete
+            print(f"✅ Inserted {len(anomalies)} anomalies")
+            return True
         except Exception as e:
             print(f"Error inserting anomalies: {e}")
+            return False
     
     def get_active_accounts(self) -> List[AdAccount]:
-        """Get all ad accounts under the Business Manager"""
+        """Get all ad accounts under the Business Manager (cached per process)"""
+        cached = _active_accounts_cache.get(self.business_id)
+        if cached and time.monotonic() - cached[0] < ACTIVE_ACCOUNTS_CACHE_TTL_SECONDS:
+            print(f"Using cached list of {len(cached[1])} active accounts for Business ID {self.business_id}")
+            return cached[1]
+        
         business = Business(self.business_id)
         
         accounts = business.get_owned_ad_accounts(
@@ -458,8 +521,13 @@ class MetaBudgetMonitorBQ:
                 active_accounts.append(account)
                 
         print(f"Found {len(active_accounts)} active accounts under Business ID {self.business_id}")
+        _active_accounts_cache[self.business_id] = (time.monotonic(), active_accounts)
         return active_accounts
     
+    def invalidate_active_accounts(self):
+        """Drop the cached account list so the next cycle refetches it"""
+        _active_accounts_cache.pop(self.business_id, None)
+    
     def monitor_active_campaigns(self, account: AdAccount) -> List[Dict]:
         """Monitor only ACTIVE campaigns in the account"""
         anomalies = []
@@ -580,11 +648,7 @@ class MetaBudgetMonitorBQ:
             # Check for anomalies
             if previous_state is None:
                 # New campaign
-                created_time_str = campaign.get('created_time')
-                # Parse timestamp with timezone
-                import re
-                clean_timestamp = re.sub(r'[+-]\d{4}$', '', created_time_str)
-                created_time = datetime.strptime(clean_timestamp, '%Y-%m-%dT%H:%M:%S')
+                created_time = self._parse_meta_timestamp_to_datetime(campaign.get('created_time'))
                 time_since_creation = datetime.now() - created_time
                 
                 if time_since_creation < timedelta(hours=1):
@@ -655,6 +719,7 @@ class MetaBudgetMonitorBQ:
                 'consecutive_anomaly_count': (previous_state['consecutive_anomaly_count'] + 1 if previous_state and len([a for a in anomalies if a['campaign_id'] == campaign_id]) > 0 else 0) if previous_state else 0
             })
             
+            snapshot['delivery_severity'] = DELIVERY_SEVERITY.get(snapshot['delivery_status_simple'][:1], 1)
             snapshots.append(snapshot)
         
         # Insert data into BigQuery
@@ -663,8 +728,13 @@ class MetaBudgetMonitorBQ:
         
         return anomalies
     
-    def send_google_chat_alert(self, anomalies: List[Dict]):
-        """Send alerts to Google Chat Space"""
+    def send_google_chat_alert(self, anomalies: List[Dict], mark_sent: bool = True):
+        """Send alerts to Google Chat Space
+        
+        Args:
+            anomalies: Anomalies to include in the alert card
+            mark_sent: Set alert_sent in BigQuery after posting - only valid once the rows are loaded
+        """
         if not anomalies:
             return
         
@@ -737,7 +807,12 @@ class MetaBudgetMonitorBQ:
         current_time_pst = datetime.now(pst)
         is_morning_reminder = 8 <= current_time_pst.hour <= 10
         
-        insights_text = f"💡 <b>Insights:</b> Anomalies detected during {'business hours' if datetime.now().hour >= self.config['business_hours']['start'] and datetime.now().hour <= self.config['business_hours']['end'] else 'off-hours'}."
+        now_hour = datetime.now().hour
+        business_hours = self.config['business_hours']
+        in_business_hours = business_hours['start'] <= now_hour <= business_hours['end']
+        window_label = 'business hours' if in_business_hours else 'off-hours'
+        
+        insights_text = f"💡 <b>Insights:</b> Anomalies detected during {window_label}."
         
         if is_morning_reminder:
             insights_text += "\n🌅 <b>Morning Reminder:</b> This may include unacknowledged alerts from yesterday."
@@ -754,12 +829,17 @@ class MetaBudgetMonitorBQ:
         card["cards"][0]["sections"].append(insights_section)
         
         # Send to Google Chat
+        self._post_google_chat_alert(webhook_url, card, filtered_anomalies, mark_sent)
+    
+    def _post_google_chat_alert(self, webhook_url: str, card: Dict, anomalies: List[Dict], mark_sent: bool = True):
+        """Post an alert card to Google Chat and mark its anomalies as sent"""
         try:
-            response = requests.post(webhook_url, json=card)
+            response = self._http.post(webhook_url, json=card, timeout=10)
             if response.status_code == 200:
                 print(f"✅ Alert sent to Google Chat")
                 # Mark anomalies as alert_sent in BigQuery (only for those actually sent)
-                self._mark_alerts_sent(filtered_anomalies)
+                if mark_sent:
+                    self._mark_alerts_sent(anomalies)
             else:
                 print(f"❌ Failed to send Google Chat alert: {response.status_code}")
         except Exception as e:
@@ -788,10 +868,20 @@ class MetaBudgetMonitorBQ:
         )
         
         try:
-            self.bq_client.query(query, job_config=job_config).result()
+            # Don't wait for the UPDATE here; _drain_pending_work checks the result
+            self._pending_jobs.append(self.bq_client.query(query, job_config=job_config))
         except Exception as e:
             print(f"Error marking alerts as sent: {e}")
     
+    def _drain_pending_work(self):
+        """Wait for background alert_sent updates to finish"""
+        for job in self._pending_jobs:
+            try:
+                job.result()
+            except Exception as e:
+                print(f"Error marking alerts as sent: {e}")
+        self._pending_jobs.clear()
+    
     def run_monitoring_cycle(self):
         """Run a complete monitoring cycle"""
         print(f"Starting monitoring cycle for Business ID: {self.business_id}")
@@ -812,17 +902,28 @@ class MetaBudgetMonitorBQ:
             
             # Insert anomalies to BigQuery
             if all_anomalies:
-                self.insert_anomalies(all_anomalies)
-                self.send_google_chat_alert(all_anomalies)
+                # Rows must be loaded before alerts can mark them as sent; if the load
+                # failed, still alert but leave nothing to UPDATE
+                anomalies_loaded = self.insert_anomalies(all_anomalies)
+                self.send_google_chat_alert(all_anomalies, mark_sent=anomalies_loaded)
             
             # Update account activity patterns for ML
             self._update_account_activity()
             
             print(f"✅ Monitoring cycle complete. Found {len(all_anomalies)} anomalies.")
             
+        except FacebookRequestError as e:
+            # An account may have been disabled or removed - refetch next cycle
+            self.invalidate_active_accounts()
+            print(f"❌ Error during monitoring cycle: {str(e)}")
+            raise e
         except Exception as e:
             print(f"❌ Error during monitoring cycle: {str(e)}")
             raise e
+        finally:
+            # The alert_sent UPDATE overlapped with the activity update; wait for it even
+            # when the cycle failed, so its outcome is logged before the instance goes away
+            self._drain_pending_work()
     
     def _update_account_activity(self):
         """Update daily account activity patterns for ML training"""
@@ -839,13 +940,25 @@ class MetaBudgetMonitorBQ:
             AVG(budget_amount) as avg_campaign_budget,
             MAX(budget_amount) as max_campaign_budget,
             SUM(CASE WHEN budget_change_percentage > 0 THEN budget_amount - previous_budget_amount ELSE 0 END) as total_budget_increase_amount,
-            MIN(EXTRACT(HOUR FROM snapshot_timestamp)) as earliest_activity_hour,
-            MAX(EXTRACT(HOUR FROM snapshot_timestamp)) as latest_activity_hour,
-            SUM(CASE WHEN EXTRACT(HOUR FROM snapshot_timestamp) < 8 OR EXTRACT(HOUR FROM snapshot_timestamp) > 18 THEN 1 ELSE 0 END) as activities_outside_business_hours,
+            MIN(hr) as earliest_activity_hour,
+            MAX(hr) as latest_activity_hour,
+            SUM(CASE WHEN hr < 8 OR hr > 18 THEN 1 ELSE 0 END) as activities_outside_business_hours,
             EXTRACT(DAYOFWEEK FROM CURRENT_DATE()) IN (1, 7) as is_weekend,
             FALSE as is_holiday  -- TODO: Add holiday calendar
-        FROM `{self.project_id}.{self.dataset_id}.meta_campaign_snapshots`
-        WHERE DATE(snapshot_timestamp) = CURRENT_DATE()
+        FROM (
+            SELECT 
+                account_id,
+                campaign_id,
+                budget_amount,
+                previous_budget_amount,
+                budget_change_percentage,
+                budget_type,
+                is_new_campaign,
+                EXTRACT(HOUR FROM snapshot_timestamp) as hr
+            FROM `{self.project_id}.{self.dataset_id}.meta_campaign_snapshots`
+            WHERE snapshot_timestamp >= TIMESTAMP(CURRENT_DATE())
+            AND snapshot_timestamp < TIMESTAMP(DATE_ADD(CURRENT_DATE(), INTERVAL 1 DAY))
+        ) t
         GROUP BY account_id
         """
         
@@ -8,7 +8,13 @@ ADD COLUMN IF NOT EXISTS adsets_with_active_ads INTEGER,
 ADD COLUMN IF NOT EXISTS delivery_status_simple STRING,
 ADD COLUMN IF NOT EXISTS start_time TIMESTAMP,
 ADD COLUMN IF NOT EXISTS stop_time TIMESTAMP,
-ADD COLUMN IF NOT EXISTS is_future_campaign BOOLEAN;
+ADD COLUMN IF NOT EXISTS is_future_campaign BOOLEAN,
+-- 0 = delivering, 1 = unknown, 2 = no active ads, 3 = ad sets paused, 4 = no ad sets
+ADD COLUMN IF NOT EXISTS delivery_severity INTEGER;
+
+-- Cluster existing snapshots by account and campaign (new tables get this from bigquery_schema.sql).
+-- Clustering can't be changed with DDL; run once from the command line:
+--   bq update --clustering_fields=account_name,campaign_id generative-ai-418805:budget_alert.meta_campaign_snapshots
 
 -- Also add to anomalies table
 ALTER TABLE `generative-ai-418805.budget_alert.meta_anomalies`
@@ -19,11 +25,19 @@ ADD COLUMN IF NOT EXISTS active_adsets INTEGER;
 -- Create view to easily find zombie campaigns
 CREATE OR REPLACE VIEW `generative-ai-418805.budget_alert.meta_zombie_campaigns` AS
 WITH latest_campaigns AS (
-    SELECT 
-        *,
-        ROW_NUMBER() OVER (PARTITION BY campaign_id ORDER BY snapshot_timestamp DESC) as rn
-    FROM `generative-ai-418805.budget_alert.meta_campaign_snapshots`
-    WHERE DATE(snapshot_timestamp) = CURRENT_DATE()
+    -- Top-1 per campaign via ARRAY_AGG ... LIMIT 1 avoids sorting every snapshot of the day
+    SELECT latest_snapshot.*
+    FROM (
+        -- Only the columns the view reads are carried through the aggregation
+        SELECT ARRAY_AGG(STRUCT(
+            s.campaign_id, s.campaign_name, s.account_name, s.campaign_status,
+            s.budget_amount, s.budget_type, s.delivery_status_simple,
+            s.total_adsets, s.active_adsets, s.adsets_with_active_ads
+        ) ORDER BY s.snapshot_timestamp DESC LIMIT 1)[OFFSET(0)] as latest_snapshot
+        FROM `generative-ai-418805.budget_alert.meta_campaign_snapshots` s
+        WHERE s.snapshot_timestamp >= TIMESTAMP(CURRENT_DATE())
+        GROUP BY s.campaign_id
+    )
 )
 SELECT 
     campaign_id,
@@ -46,8 +60,7 @@ SELECT
         ELSE 'OK'
     END as risk_level
 FROM latest_campaigns
-WHERE rn = 1
-    AND campaign_status = 'ACTIVE'
+WHERE campaign_status = 'ACTIVE'
     AND delivery_status_simple NOT LIKE '🟢%'
     AND delivery_status_simple NOT LIKE '❓%'
     AND budget_amount > 1000
@@ -56,11 +69,17 @@ ORDER BY monthly_budget_at_risk DESC;
 -- Summary view for dashboard
 CREATE OR REPLACE VIEW `generative-ai-418805.budget_alert.meta_delivery_summary` AS
 WITH latest AS (
-    SELECT 
-        *,
-        ROW_NUMBER() OVER (PARTITION BY campaign_id ORDER BY snapshot_timestamp DESC) as rn
-    FROM `generative-ai-418805.budget_alert.meta_campaign_snapshots`
-    WHERE DATE(snapshot_timestamp) = CURRENT_DATE()
+    -- Top-1 per campaign via ARRAY_AGG ... LIMIT 1 avoids sorting every snapshot of the day
+    SELECT latest_snapshot.*
+    FROM (
+        -- Only the columns the summary reads are carried through the aggregation
+        SELECT ARRAY_AGG(STRUCT(
+            s.campaign_id, s.account_name, s.campaign_status, s.budget_amount, s.delivery_status_simple
+        ) ORDER BY s.snapshot_timestamp DESC LIMIT 1)[OFFSET(0)] as latest_snapshot
+        FROM `generative-ai-418805.budget_alert.meta_campaign_snapshots` s
+        WHERE s.snapshot_timestamp >= TIMESTAMP(CURRENT_DATE())
+        GROUP BY s.campaign_id
+    )
 )
 SELECT 
     COUNT(DISTINCT campaign_id) as total_campaigns,
@@ -75,5 +94,63 @@ SELECT
     END) as daily_budget_at_risk,
     COUNT(DISTINCT account_name) as accounts_affected
 FROM latest
-WHERE rn = 1
-    AND campaign_status = 'ACTIVE';
\ No newline at end of file
+WHERE campaign_status = 'ACTIVE';
+
+-- Latest snapshot per campaign per PST day, read by the dashboard instead of
+-- re-running the ROW_NUMBER dedup over the raw snapshots on every page load.
+-- Replaces the earlier materialized view, which rescanned the whole snapshot history
+-- on every refresh
+DROP MATERIALIZED VIEW IF EXISTS `generative-ai-418805.budget_alert.meta_campaign_latest_mv`;
+
+-- Dedup for the PST days from since_date onward; the timestamp filter keeps each
+-- refresh to the days being rebuilt
+CREATE OR REPLACE TABLE FUNCTION `generative-ai-418805.budget_alert.meta_campaign_latest_since`(since_date DATE)
+AS
+SELECT 
+    DATE(DATETIME(snapshot_timestamp, "America/Los_Angeles")) as snapshot_date,
+    campaign_id,
+    account_name,
+    campaign_name,
+    campaign_status,
+    budget_amount,
+    budget_type,
+    objective,
+    created_time,
+    start_time,
+    stop_time,
+    delivery_status_simple,
+    -- Rows written before delivery_severity existed fall back to the status emoji
+    COALESCE(delivery_severity, CASE 
+        WHEN delivery_status_simple LIKE '🟢%' THEN 0
+        WHEN delivery_status_simple LIKE '🟡%' THEN 2
+        WHEN delivery_status_simple LIKE '🟠%' THEN 3
+        WHEN delivery_status_simple LIKE '🔴%' THEN 4
+        ELSE 1
+    END) as delivery_severity,
+    total_adsets,
+    active_adsets,
+    adsets_with_active_ads,
+    snapshot_timestamp
+FROM `generative-ai-418805.budget_alert.meta_campaign_snapshots`
+WHERE snapshot_timestamp >= TIMESTAMP(since_date, "America/Los_Angeles")
+QUALIFY ROW_NUMBER() OVER (
+    PARTITION BY DATE(DATETIME(snapshot_timestamp, "America/Los_Angeles")), campaign_id 
+    ORDER BY snapshot_timestamp DESC
+) = 1;
+
+-- Backfill. Partitioned on snapshot_date so the dashboard's day/range filters read only
+-- matching partitions; days older than the expiration are dropped automatically.
+-- Rebuilding rescans up to 400 days of snapshots - kept current afterwards by the scheduled
+-- query in refresh_meta_campaign_latest.sql
+CREATE OR REPLACE TABLE `generative-ai-418805.budget_alert.meta_campaign_latest`
+PARTITION BY snapshot_date
+CLUSTER BY account_name
+OPTIONS(
+    partition_expiration_days = 400,
+    description = "Latest snapshot per campaign per PST day for the dashboard"
+)
+AS
+SELECT *
+FROM `generative-ai-418805.budget_alert.meta_campaign_latest_since`(
+    DATE_SUB(CURRENT_DATE("America/Los_Angeles"), INTERVAL 400 DAY)
+);
@@ -3,34 +3,45 @@ Simple authentication for Streamlit dashboard
 """
 import streamlit as st
 import hashlib
+import hmac
 import os
 from datetime import datetime, timedelta
 
 # Authorized users - in production, store these securely
+# Hashes are configured as hex strings and decoded to raw SHA256 digests at login
 AUTHORIZED_USERS = {
     "admin": os.getenv("ADMIN_PASSWORD_HASH", "5994471abb01112afcc18159f6cc74b4f511b99806da59b3caf5a9c173cacfc5"),  # default: 12345
     "viewer": os.getenv("VIEWER_PASSWORD_HASH", "5994471abb01112afcc18159f6cc74b4f511b99806da59b3caf5a9c173cacfc5")
 }
 
+SESSION_DURATION = timedelta(hours=24)
+
 def hash_password(password):
-    """Hash a password using SHA256"""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """Hash a password using SHA256, returning the raw digest bytes"""
+    return hashlib.sha256(password.encode()).digest()
+
+def stored_password_digest(username):
+    """Decode a user's configured hash, or None if it isn't valid hex (login then fails)"""
+    try:
+        return bytes.fromhex(AUTHORIZED_USERS[username])
+    except ValueError:
+        return None
 
 def check_auth():
     """Check if user is authenticated"""
     # Initialize session state
     if 'authenticated' not in st.session_state:
         st.session_state.authenticated = False
-    if 'auth_time' not in st.session_state:
-        st.session_state.auth_time = None
+    if 'auth_expires_at' not in st.session_state:
+        st.session_state.auth_expires_at = None
     
     # Check if already authenticated and not expired (24 hour session)
-    if st.session_state.authenticated and st.session_state.auth_time:
-        if datetime.now() - st.session_state.auth_time < timedelta(hours=24):
+    if st.session_state.authenticated and st.session_state.auth_expires_at:
+        if datetime.now() < st.session_state.auth_expires_at:
             return True
         else:
             st.session_state.authenticated = False
-            st.session_state.auth_time = None
+            st.session_state.auth_expires_at = None
     
     # Show login form
     with st.container():
@@ -46,9 +57,10 @@ def check_auth():
                 
                 if submit:
                     if username in AUTHORIZED_USERS:
-                        if hash_password(password) == AUTHORIZED_USERS[username]:
+                        stored_digest = stored_password_digest(username)
+                        if stored_digest is not None and hmac.compare_digest(hash_password(password), stored_digest):
                             st.session_state.authenticated = True
-                            st.session_state.auth_time = datetime.now()
+                            st.session_state.auth_expires_at = datetime.now() + SESSION_DURATION
                             st.session_state.username = username
                             st.success("✅ Login successful!")
                             st.rerun()
@@ -67,7 +79,7 @@ def logout_button():
     """Add a logout button to the sidebar"""
     if st.sidebar.button("🚪 Logout", key="logout_btn"):
         st.session_state.authenticated = False
-        st.session_state.auth_time = None
+        st.session_state.auth_expires_at = None
         st.session_state.username = None
         st.rerun()
     
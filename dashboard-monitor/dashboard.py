@@ -5,26 +5,32 @@ Real-time monitoring and analytics for Meta advertising campaigns
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 
 from google.cloud import bigquery
+from google.cloud import bigquery_storage
+from google.api_core.exceptions import NotFound
 from datetime import datetime, timedelta
-import plotly.express as px
 import plotly.graph_objects as go
 import os
 from dotenv import load_dotenv
 import base64
 import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from pathlib import Path
 import pytz
 
 # Load environment variables
 load_dotenv()
 
+# Bundled assets live next to this file
+ASSETS_DIR = Path(__file__).parent
+FAVICON_PATH = ASSETS_DIR / "favicon.png"
+
 # Page configuration - MUST BE FIRST
-# Load favicon if exists
-page_icon = "💰"  # Default emoji
-favicon_path = os.path.join(os.path.dirname(__file__), "favicon.png")
-if os.path.exists(favicon_path):
-    page_icon = favicon_path
+# Use favicon if it exists, otherwise the default emoji
+page_icon = str(FAVICON_PATH) if FAVICON_PATH.is_file() else "💰"
 
 st.set_page_config(
     page_title="Meta Ads Budget Monitor",
@@ -33,645 +39,14 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS for dark theme with blue accents
-st.markdown("""
-<style>
-    /* Import Google Font */
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
-    
-    /* Reset and base styles */
-    .stApp {
-        background-color: #0e1117;
-        color: #fafafa;
-    }
-    
-    /* Hide default Streamlit elements */
-    #MainMenu {visibility: hidden;}
-    footer {visibility: hidden;}
-    header {visibility: hidden;}
-    
-    /* Remove top padding/margin from Streamlit app */
-    .main > div {
-        padding-top: 0rem !important;
-    }
-    
-    .stApp > div > div {
-        padding-top: 0rem !important;
-    }
-    
-    /* Remove default Streamlit header space */
-    .stApp [data-testid="stToolbar"] {
-        display: none !important;
-    }
-    
-    .stApp [data-testid="stHeader"] {
-        display: none !important;
-    }
-    
-    /* Custom header styling - Professional layout */
-    .dashboard-header {
-        background: linear-gradient(90deg, #1a1f2e 0%, #0e1117 100%);
-        padding: 1.25rem 2rem;
-        margin: -1rem -1rem 1.5rem -1rem;
-        border-bottom: 2px solid #4da3ff;
-        display: flex;
-        align-items: center;
-        justify-content: space-between;
-        box-shadow: 0 4px 20px rgba(0, 0, 0, 0.3);
-    }
-    
-    .dashboard-header-left {
-        display: flex;
-        align-items: center;
-        gap: 1.5rem;
-    }
-    
-    .dashboard-logo {
-        height: 45px;
-        filter: drop-shadow(0 2px 4px rgba(0, 0, 0, 0.3));
-    }
-    
-    .dashboard-title {
-        font-size: 1.75rem;
-        font-weight: 700;
-        color: #ffffff;
-        margin: 0;
-        font-family: 'Inter', sans-serif;
-        letter-spacing: -0.02em;
-    }
-    
-    .dashboard-subtitle {
-        font-size: 0.9rem;
-        color: #94a3b8;
-        margin: 0;
-        font-family: 'Inter', sans-serif;
-    }
-    
-    .dashboard-header-right {
-        display: flex;
-        flex-direction: column;
-        align-items: flex-end;
-        gap: 0.25rem;
-    }
-    
-    .last-updated {
-        font-size: 0.8rem;
-        color: #64748b;
-        font-family: 'Inter', sans-serif;
-    }
-    
-    .update-time {
-        font-size: 1rem;
-        color: #4da3ff;
-        font-weight: 600;
-        font-family: 'Inter', sans-serif;
-    }
-    
-    /* Metric cards */
-    div[data-testid="metric-container"] {
-        background-color: #1a1f2e;
-        border: 1px solid #2d3748;
-        padding: 1.5rem;
-        border-radius: 12px;
-        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-        transition: all 0.3s ease;
-    }
-    
-    div[data-testid="metric-container"]:hover {
-        border-color: #4da3ff;
-        box-shadow: 0 6px 12px rgba(77, 163, 255, 0.2);
-        transform: translateY(-2px);
-    }
-    
-    div[data-testid="metric-container"] > label {
-        color: #94a3b8 !important;
-        font-weight: 500;
-        text-transform: uppercase;
-        font-size: 0.875rem;
-        letter-spacing: 0.05em;
-    }
-    
-    div[data-testid="metric-container"] [data-testid="metric-value"] {
-        color: #4da3ff !important;
-        font-weight: 700;
-        font-size: 2rem;
-    }
-    
-    /* Sidebar styling */
-    section[data-testid="stSidebar"] {
-        background-color: #1a1f2e;
-        border-right: 1px solid #2d3748;
-    }
-    
-    section[data-testid="stSidebar"] > div {
-        background-color: #1a1f2e;
-        padding-top: 2rem;
-    }
-    
-    /* Tab styling */
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 8px;
-        background-color: transparent;
-        border-bottom: 2px solid #2d3748;
-        padding-bottom: 0;
-    }
-    
-    .stTabs [data-baseweb="tab"] {
-        background-color: transparent;
-        color: #94a3b8;
-        border: none;
-        font-weight: 500;
-        font-size: 1rem;
-        padding: 0.75rem 1.5rem;
-        border-radius: 8px 8px 0 0;
-        transition: all 0.3s ease;
-    }
-    
-    .stTabs [data-baseweb="tab"]:hover {
-        color: #4da3ff;
-        background-color: rgba(77, 163, 255, 0.1);
-    }
-    
-    .stTabs [aria-selected="true"] {
-        background-color: #4da3ff !important;
-        color: white !important;
-    }
-    
-    /* Button styling */
-    .stButton > button {
-        background-color: #4da3ff;
-        color: white;
-        border: none;
-        border-radius: 8px;
-        padding: 0.75rem 1.5rem;
-        font-weight: 600;
-        transition: all 0.3s ease;
-        font-family: 'Inter', sans-serif;
-    }
-    
-    .stButton > button:hover {
-        background-color: #2d8ff0;
-        box-shadow: 0 4px 12px rgba(77, 163, 255, 0.3);
-        transform: translateY(-1px);
-    }
-    
-    
-    /* Input field styling */
-    .stTextInput > div > div > input,
-    .stSelectbox > div > div > select,
-    .stMultiSelect > div > div,
-    .stDateInput > div > div > input {
-        background-color: #2d3748;
-        border: 1px solid #4a5568;
-        color: #fafafa;
-        border-radius: 8px;
-    }
-    
-    .stTextInput > div > div > input:focus,
-    .stSelectbox > div > div > select:focus {
-        border-color: #4da3ff;
-        box-shadow: 0 0 0 1px #4da3ff;
-    }
-    
-    /* DataFrame styling */
-    .dataframe {
-        background-color: #1a1f2e !important;
-        color: #fafafa !important;
-        border: none !important;
-    }
-    
-    .dataframe thead tr th {
-        background-color: #2d3748 !important;
-        color: #4da3ff !important;
-        font-weight: 600;
-        text-transform: uppercase;
-        font-size: 0.75rem;
-        letter-spacing: 0.05em;
-        padding: 1rem 0.5rem !important;
-        border-bottom: 2px solid #4a5568 !important;
-    }
-    
-    .dataframe tbody tr {
-        border-bottom: 1px solid #2d3748 !important;
-    }
-    
-    .dataframe tbody tr:hover {
-        background-color: rgba(77, 163, 255, 0.05) !important;
-    }
-    
-    .dataframe tbody tr td {
-        padding: 0.75rem 0.5rem !important;
-        color: #fafafa !important;
-    }
-    
-    /* High budget highlighting */
-    .high-budget-tag {
-        background-color: rgba(245, 158, 11, 0.2);
-        color: #f59e0b;
-        padding: 0.25rem 0.75rem;
-        border-radius: 9999px;
-        font-size: 0.75rem;
-        font-weight: 600;
-        display: inline-block;
-        margin-left: 0.5rem;
-    }
-    
-    .very-high-budget-tag {
-        background-color: rgba(239, 68, 68, 0.2);
-        color: #ef4444;
-        padding: 0.25rem 0.75rem;
-        border-radius: 9999px;
-        font-size: 0.75rem;
-        font-weight: 600;
-        display: inline-block;
-        margin-left: 0.5rem;
-    }
-    
-    .budget-warning {
-        color: #f59e0b !important;
-        font-weight: 600;
-    }
-    
-    .budget-critical {
-        color: #ef4444 !important;
-        font-weight: 700;
-    }
-    
-    /* Alert boxes */
-    .alert-box {
-        padding: 1rem;
-        border-radius: 8px;
-        margin: 0.5rem 0;
-        font-family: 'Inter', sans-serif;
-    }
-    
-    .alert-critical {
-        background-color: rgba(239, 68, 68, 0.1);
-        border: 1px solid rgba(239, 68, 68, 0.3);
-        border-left: 4px solid #ef4444;
-    }
-    
-    .alert-warning {
-        background-color: rgba(245, 158, 11, 0.1);
-        border: 1px solid rgba(245, 158, 11, 0.3);
-        border-left: 4px solid #f59e0b;
-    }
-    
-    .alert-info {
-        background-color: rgba(77, 163, 255, 0.1);
-        border: 1px solid rgba(77, 163, 255, 0.3);
-        border-left: 4px solid #4da3ff;
-    }
-    
-    /* Expander styling */
-    .streamlit-expanderHeader {
-        background-color: #1a1f2e;
-        border: 1px solid #2d3748;
-        border-radius: 8px;
-        color: #4da3ff !important;
-        font-weight: 600;
-        transition: all 0.3s ease;
-    }
-    
-    .streamlit-expanderHeader:hover {
-        background-color: #2d3748;
-        border-color: #4da3ff;
-    }
-    
-    /* Plotly chart styling */
-    .js-plotly-plot {
-        background-color: transparent !important;
-    }
-    
-    /* Custom scrollbar */
-    ::-webkit-scrollbar {
-        width: 10px;
-        height: 10px;
-    }
-    
-    ::-webkit-scrollbar-track {
-        background: #1a1f2e;
-    }
-    
-    ::-webkit-scrollbar-thumb {
-        background: #4a5568;
-        border-radius: 5px;
-    }
-    
-    ::-webkit-scrollbar-thumb:hover {
-        background: #4da3ff;
-    }
-    
-    /* Success message styling */
-    .success-message {
-        background-color: rgba(34, 197, 94, 0.1);
-        border: 1px solid rgba(34, 197, 94, 0.3);
-        border-left: 4px solid #22c55e;
-        padding: 1rem;
-        border-radius: 8px;
-        color: #22c55e;
-        font-weight: 500;
-    }
-    
-    /* Make sidebar toggle arrow more visible */
-    button[kind="header"] {
-        background-color: #4da3ff !important;
-        color: white !important;
-        border-radius: 50% !important;
-        width: 2.5rem !important;
-        height: 2.5rem !important;
-        transition: all 0.3s ease !important;
-    }
-    
-    button[kind="header"]:hover {
-        background-color: #2d8ff0 !important;
-        transform: scale(1.1) !important;
-        box-shadow: 0 4px 12px rgba(77, 163, 255, 0.4) !important;
-    }
-    
-    /* Style the arrow icon itself */
-    button[kind="header"] svg {
-        width: 1.25rem !important;
-        height: 1.25rem !important;
-        color: white !important;
-    }
-    
-    /* Position adjustment for better visibility */
-    .stApp > header {
-        background-color: transparent !important;
-    }
-    
-    /* Animations */
-    @keyframes fadeIn {
-        from {
-            opacity: 0;
-            transform: translateY(10px);
-        }
-        to {
-            opacity: 1;
-            transform: translateY(0);
-        }
-    }
-    
-    @keyframes slideIn {
-        from {
-            opacity: 0;
-            transform: translateX(-20px);
-        }
-        to {
-            opacity: 1;
-            transform: translateX(0);
-        }
-    }
-    
-    @keyframes pulse {
-        0% {
-            box-shadow: 0 0 0 0 rgba(77, 163, 255, 0.4);
-        }
-        70% {
-            box-shadow: 0 0 0 10px rgba(77, 163, 255, 0);
-        }
-        100% {
-            box-shadow: 0 0 0 0 rgba(77, 163, 255, 0);
-        }
-    }
-    
-    /* Apply animations to elements */
-    div[data-testid="metric-container"] {
-        animation: fadeIn 0.6s ease-out;
-        animation-fill-mode: both;
-    }
-    
-    div[data-testid="metric-container"]:nth-child(1) {
-        animation-delay: 0.1s;
-    }
-    
-    div[data-testid="metric-container"]:nth-child(2) {
-        animation-delay: 0.2s;
-    }
-    
-    div[data-testid="metric-container"]:nth-child(3) {
-        animation-delay: 0.3s;
-    }
-    
-    div[data-testid="metric-container"]:nth-child(4) {
-        animation-delay: 0.4s;
-    }
-    
-    .stTabs {
-        animation: fadeIn 0.8s ease-out;
-    }
-    
-    .dataframe {
-        animation: fadeIn 1s ease-out;
-    }
-    
-    .stButton > button {
-        animation: fadeIn 0.6s ease-out;
-    }
-    
-    /* Smooth transitions for all interactive elements */
-    * {
-        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-    }
-    
-    /* Loading shimmer effect */
-    @keyframes shimmer {
-        0% {
-            background-position: -1000px 0;
-        }
-        100% {
-            background-position: 1000px 0;
-        }
-    }
-    
-    .loading-skeleton {
-        background: linear-gradient(90deg, #1a1f2e 25%, #2d3748 50%, #1a1f2e 75%);
-        background-size: 1000px 100%;
-        animation: shimmer 2s infinite;
-        border-radius: 8px;
-        height: 100%;
-        width: 100%;
-    }
-    
-    /* Number counter animation class */
-    .counting {
-        font-variant-numeric: tabular-nums;
-        animation: pulse 2s ease-out;
-    }
-    
-    /* CSS Loading spinner fallback */
-    .loading-spinner {
-        width: 60px;
-        height: 60px;
-        border: 4px solid #2d3748;
-        border-top: 4px solid #4da3ff;
-        border-radius: 50%;
-        animation: spin 1s linear infinite;
-    }
-    
-    @keyframes spin {
-        0% { transform: rotate(0deg); }
-        100% { transform: rotate(360deg); }
-    }
-    
-    /* Help button styling */
-    .help-button {
-        background-color: #2d3748;
-        color: #94a3b8;
-        border: 1px solid #4a5568;
-        border-radius: 50%;
-        width: 36px;
-        height: 36px;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        cursor: pointer;
-        transition: all 0.3s ease;
-        font-size: 1.1rem;
-        font-weight: 600;
-        margin-left: 1rem;
-    }
-    
-    .help-button:hover {
-        background-color: #4da3ff;
-        color: white;
-        border-color: #4da3ff;
-        transform: scale(1.05);
-        box-shadow: 0 4px 12px rgba(77, 163, 255, 0.3);
-    }
-    
-    /* Help modal styling */
-    .help-modal-overlay {
-        position: fixed;
-        top: 0;
-        left: 0;
-        right: 0;
-        bottom: 0;
-        background: rgba(0, 0, 0, 0.8);
-        backdrop-filter: blur(4px);
-        z-index: 99999;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        padding: 2rem;
-        animation: fadeIn 0.3s ease-out;
-    }
-    
-    .help-modal {
-        background: #1a1f2e;
-        border: 2px solid #4da3ff;
-        border-radius: 16px;
-        width: 100%;
-        max-width: 800px;
-        max-height: 90vh;
-        overflow-y: auto;
-        box-shadow: 0 20px 60px rgba(0, 0, 0, 0.5);
-        animation: slideIn 0.3s ease-out;
-    }
-    
-    .help-modal-header {
-        background: linear-gradient(90deg, #1a1f2e 0%, #0e1117 100%);
-        padding: 2rem;
-        border-bottom: 2px solid #2d3748;
-        position: sticky;
-        top: 0;
-        z-index: 10;
-        display: flex;
-        justify-content: space-between;
-        align-items: center;
-    }
-    
-    .help-modal-title {
-        font-size: 1.75rem;
-        font-weight: 700;
-        color: #4da3ff;
-        margin: 0;
-    }
-    
-    .help-modal-close {
-        background: #2d3748;
-        color: #94a3b8;
-        border: none;
-        border-radius: 50%;
-        width: 36px;
-        height: 36px;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        cursor: pointer;
-        transition: all 0.3s ease;
-        font-size: 1.25rem;
-    }
-    
-    .help-modal-close:hover {
-        background: #ef4444;
-        color: white;
-        transform: rotate(90deg);
-    }
-    
-    .help-modal-content {
-        padding: 2rem;
-    }
-    
-    .help-section {
-        margin-bottom: 2rem;
-        padding: 1.5rem;
-        background: #0e1117;
-        border-radius: 12px;
-        border: 1px solid #2d3748;
-    }
-    
-    .help-section-title {
-        font-size: 1.25rem;
-        font-weight: 600;
-        color: #4da3ff;
-        margin-bottom: 1rem;
-        display: flex;
-        align-items: center;
-        gap: 0.5rem;
-    }
-    
-    .help-section-content {
-        color: #cbd5e1;
-        line-height: 1.6;
-    }
-    
-    .help-term {
-        font-weight: 600;
-        color: #4da3ff;
-        margin-top: 0.75rem;
-    }
-    
-    .help-definition {
-        margin-left: 1rem;
-        color: #94a3b8;
-    }
-    
-    .help-metric-grid {
-        display: grid;
-        grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-        gap: 1rem;
-        margin-top: 1rem;
-    }
-    
-    .help-metric-item {
-        background: #1a1f2e;
-        padding: 1rem;
-        border-radius: 8px;
-        border: 1px solid #2d3748;
-    }
-    
-    .help-icon {
-        font-size: 1.5rem;
-        margin-bottom: 0.5rem;
-    }
-    
-</style>
-""", unsafe_allow_html=True)
+# Custom CSS for dark theme with blue accents, kept in theme.css and read once per process
+@st.cache_resource
+def load_dashboard_css():
+    """Return the dashboard stylesheet wrapped in a <style> tag"""
+    return f"<style>\n{(ASSETS_DIR / 'theme.css').read_text(encoding='utf-8')}</style>"
 
-# Add JavaScript for number counting animation
-st.markdown("""
+# JavaScript for number counting animation
+METRIC_COUNTER_JS = """
 <script>
 // Number counting animation
 function animateValue(element, start, end, duration) {
@@ -685,6 +60,7 @@ function animateValue(element, start, end, duration) {
             window.requestAnimationFrame(step);
         } else {
             element.textContent = end.toLocaleString();
+            element.dataset.animated = '1';
         }
     };
     window.requestAnimationFrame(step);
@@ -694,16 +70,22 @@ function animateValue(element, start, end, duration) {
 document.addEventListener('DOMContentLoaded', function() {
     const metricElements = document.querySelectorAll('[data-testid="metric-value"]');
     metricElements.forEach((element) => {
+        // Only count up once - reruns re-render the value anyway
+        if (element.dataset.animated) return;
         const finalValue = parseInt(element.textContent.replace(/[^0-9]/g, ''));
         if (!isNaN(finalValue)) {
             element.classList.add('counting');
-            animateValue(element, 0, finalValue, 1500);
+            animateValue(element, 0, finalValue, 400);
         }
     });
 });
 
 </script>
-""", unsafe_allow_html=True)
+"""
+
+# Streamlit drops elements that aren't re-emitted, so inject on every run
+st.markdown(load_dashboard_css(), unsafe_allow_html=True)
+st.markdown(METRIC_COUNTER_JS, unsafe_allow_html=True)
 
 # Initialize BigQuery client
 @st.cache_resource
@@ -711,85 +93,311 @@ def init_bigquery():
     project_id = os.getenv('GCP_PROJECT_ID', 'generative-ai-418805')
     return bigquery.Client(project=project_id), project_id
 
-# Skeleton loader component with custom loader GIF
-def show_skeleton_loader(type="metric", count=1):
-    """Display skeleton loaders for different component types"""
-    # Try to load the custom loader GIF
-    loader_html = ""
-    loader_path = os.path.join(os.path.dirname(__file__), "loader.gif")
-    if os.path.exists(loader_path):
-        try:
-            with open(loader_path, "rb") as f:
-                loader_data = base64.b64encode(f.read()).decode()
-            loader_html = f'<img src="data:image/gif;base64,{loader_data}" style="width: 60px; height: 60px;">'
-        except:
-            loader_html = '<div class="loading-spinner"></div>'
-    else:
-        loader_html = '<div class="loading-spinner"></div>'
-    
-    if type == "metric":
-        cols = st.columns(count)
-        for i, col in enumerate(cols):
-            with col:
-                st.markdown(f"""
-                <div style="height: 100px; margin-bottom: 1rem; display: flex; align-items: center; justify-content: center;">
-                    {loader_html}
-                </div>
-                """, unsafe_allow_html=True)
-    elif type == "table":
-        st.markdown(f"""
-        <div style="height: 400px; margin: 1rem 0; display: flex; align-items: center; justify-content: center;">
-            {loader_html}
-        </div>
-        """, unsafe_allow_html=True)
-    elif type == "chart":
-        st.markdown(f"""
-        <div style="height: 400px; margin: 1rem 0; border-radius: 12px; display: flex; align-items: center; justify-content: center;">
-            {loader_html}
-        </div>
-        """, unsafe_allow_html=True)
+# One Storage API read client (and its gRPC channel) shared by every result download
+@st.cache_resource
+def init_bigquery_storage():
+    return bigquery_storage.BigQueryReadClient()
+
+# Read and base64-encode bundled images once per process
+@st.cache_resource
+def get_image_data_uri(filename, mime_type):
+    """Return a bundled image as a base64 data URI, or None if unavailable"""
+    image_path = ASSETS_DIR / filename
+    if not image_path.is_file():
+        return None
+    return f"data:{mime_type};base64,{base64.b64encode(image_path.read_bytes()).decode()}"
 
 client, project_id = init_bigquery()
 dataset_id = "budget_alert"
 
-# Get latest data timestamp
-@st.cache_data(ttl=60)  # Cache for 1 minute
-def get_latest_data_timestamp():
-    """Get the most recent snapshot timestamp from BigQuery"""
-    try:
-        query = f"""
-        SELECT MAX(snapshot_timestamp) as latest_timestamp
-        FROM `{project_id}.{dataset_id}.meta_campaign_snapshots`
-        """
-        result = client.query(query).to_dataframe()
-        if not result.empty and result['latest_timestamp'].iloc[0] is not None:
-            timestamp = result['latest_timestamp'].iloc[0]
-            # Convert to regular datetime if it's a BigQuery timestamp
-            if hasattr(timestamp, 'to_pydatetime'):
-                return timestamp.to_pydatetime()
-            return timestamp
-    except Exception as e:
-        st.warning(f"Could not fetch data timestamp: {str(e)}")
-    return datetime.now()  # Fallback to current time
+# Table holding the latest snapshot per campaign per PST day, kept current by a scheduled query
+# (created by add_delivery_columns.sql, refreshed by refresh_meta_campaign_latest.sql - see README.md)
+latest_view = f"`{project_id}.{dataset_id}.meta_campaign_latest`"
+
+# Dashboard display timezone - BigQuery timestamps are converted from UTC once, at the cache boundary
+PST = pytz.timezone('America/Los_Angeles')
+
+# Query parameters are passed as (name, type, value) tuples - hashable for st.cache_data,
+# and tuple values become ARRAY parameters. Keeping values out of the SQL text lets
+# BigQuery's result cache match across reruns and keeps account names from breaking quoting
+def query_config(params):
+    """Build a QueryJobConfig from (name, type, value) parameter tuples"""
+    return bigquery.QueryJobConfig(query_parameters=[
+        bigquery.ArrayQueryParameter(name, type_, list(value)) if isinstance(value, tuple)
+        else bigquery.ScalarQueryParameter(name, type_, value)
+        for name, type_, value in params
+    ])
+
+# Account options churn at most daily, so they outlive the 5 minute freshness cache
+@st.cache_data(ttl=3600, show_spinner=False)  # Cache for 1 hour
+def get_account_names(start_date, end_date):
+    """Get the names of accounts with snapshots in the date range"""
+    accounts_query = f"""
+    SELECT DISTINCT account_name
+    FROM `{project_id}.{dataset_id}.meta_campaign_snapshots`
+    WHERE snapshot_timestamp >= TIMESTAMP(@start_date)
+    AND snapshot_timestamp < TIMESTAMP(DATE_ADD(@end_date, INTERVAL 1 DAY))
+    ORDER BY account_name
+    """
+    accounts_job = client.query(accounts_query, job_config=query_config((
+        ("start_date", "DATE", start_date),
+        ("end_date", "DATE", end_date),
+    )))
+    return [account_row['account_name'] for account_row in accounts_job.result()]
+
+# Only the timestamp is cached - the "N minutes ago" label is recomputed on every rerun
+@st.cache_data(ttl=300, show_spinner=False)  # Cache for 5 minutes
+def get_latest_snapshot_time():
+    """Get the newest snapshot timestamp (UTC-aware), or None when there are no snapshots"""
+    # Read from the table the page queries use, so the header reports the age of the data shown;
+    # only the last two partitions are scanned - the scheduled refresh rebuilds exactly those
+    freshness_query = f"""
+    SELECT MAX(snapshot_timestamp) as latest_timestamp
+    FROM {latest_view}
+    WHERE snapshot_date >= DATE_SUB(CURRENT_DATE("America/Los_Angeles"), INTERVAL 1 DAY)
+    """
+    # Read the single row directly - no DataFrame needed for one scalar
+    row = next(iter(client.query(freshness_query).result()), None)
+    return row['latest_timestamp'] if row is not None else None
+
+def describe_data_freshness(latest_timestamp):
+    """Format the header's PST update time and age label for a snapshot timestamp"""
+    if latest_timestamp is None:
+        return datetime.now(PST).strftime('%I:%M %p PST'), ""  # Fallback to current time
+    
+    # BigQuery returns TIMESTAMP values as UTC-aware datetimes
+    formatted_time = latest_timestamp.astimezone(PST).strftime('%I:%M %p PST')
+    minutes_ago = int((datetime.now(pytz.utc) - latest_timestamp).total_seconds() // 60)
+    
+    if minutes_ago < 1:
+        time_ago = "just now"
+    elif minutes_ago == 1:
+        time_ago = "1 minute ago"
+    elif minutes_ago < 60:
+        time_ago = f"{minutes_ago} minutes ago"
+    else:
+        hours_ago = minutes_ago // 60
+        time_ago = f"{hours_ago} hour{'s' if hours_ago > 1 else ''} ago"
+    return formatted_time, time_ago
+
+# Result cache for the page queries - keyed on the SQL text and its parameters (dates, accounts,
+# thresholds), so identical reruns reuse the DataFrame instead of starting a new BigQuery job.
+# TTL matches the 5 minute auto-refresh advertised in the footer
+@st.cache_data(ttl=300, show_spinner=False)
+def run_query(query, params=()):
+    """Run a parameterized BigQuery query and return the result as a DataFrame
+    
+    Uses the module-level client and takes only SQL text and (name, type, value) tuples of
+    dates, strings and numbers, which Streamlit hashes cheaply without custom hash_funcs.
+    """
+    # Download through the BigQuery Storage API (Arrow) rather than paging JSON over REST,
+    # keeping STRING columns Arrow-backed instead of converting them to Python objects
+    return client.query(query, job_config=query_config(params)).to_dataframe(
+        bqstorage_client=init_bigquery_storage(),
+        string_dtype=pd.StringDtype(storage="pyarrow")
+    )
+
+# Worker pool for one script run's page queries. Not a cached resource: a pool shared across
+# sessions makes concurrent viewers queue behind each other's queries. Each worker is attached
+# to the current script run context so the cached run_query works without context warnings
+def get_query_executor(max_workers):
+    """Return a thread pool for this script run, its workers attached to the run context"""
+    script_run_ctx = get_script_run_ctx()
+    return ThreadPoolExecutor(
+        max_workers=max_workers,
+        initializer=lambda: add_script_run_ctx(ctx=script_run_ctx)
+    )
+
+# Dark theme shared by every chart on the page - passed to fig.update_layout(**COMMON_LAYOUT, ...)
+COMMON_LAYOUT = dict(
+    template="plotly_dark",
+    plot_bgcolor='rgba(0,0,0,0)',
+    paper_bgcolor='rgba(0,0,0,0)',
+    font=dict(color='#fafafa'),
+    title_font=dict(size=20, color='#4da3ff')
+)
+
+COMMON_LEGEND = dict(
+    yanchor="top",
+    y=0.99,
+    xanchor="left",
+    x=0.01,
+    bgcolor="rgba(0,0,0,0.5)"
+)
+
+# Unified hover labels hit-test every trace on each mouse move and freeze on long series
+UNIFIED_HOVER_POINT_LIMIT = 500
+
+def trend_hovermode(n_points):
+    """Unified x hover for short series, plain per-point x hover for long ones"""
+    return 'x unified' if n_points < UNIFIED_HOVER_POINT_LIMIT else 'x'
+
+def budget_status(amounts, high_threshold, very_high_threshold):
+    """Label each budget as VERY HIGH / HIGH / Normal against the alert thresholds"""
+    amounts = amounts.to_numpy(dtype=float)
+    return np.select(
+        [amounts >= very_high_threshold, amounts >= high_threshold],
+        ['🚨 VERY HIGH', '⚠️ HIGH'],
+        default='✅ Normal'
+    )
+
+# Campaign table columns in display order, mapped to their display names (shared by both tab views)
+CAMPAIGN_DISPLAY_COLUMNS = {
+    'account_name': 'Account',
+    'campaign_name': 'Campaign',
+    'budget_amount': 'Budget',
+    'status': 'Risk Level',
+    'delivery_status_simple': 'Delivery',
+    'budget_type': 'Type',
+    'objective': 'Objective',
+    'created_date': 'Created',
+    'start_date': 'Start Date',
+    'end_date': 'End Date',
+    'days_active': 'Days Active',
+}
+
+# Repeated labels in the campaign table - one entry per account/type/objective/status
+CAMPAIGN_CATEGORY_COLUMNS = ('account_name', 'budget_type', 'objective', 'delivery_status_simple')
+
+def format_campaigns(campaigns_df, high_threshold, very_high_threshold):
+    """Add the budget risk label and select/rename the campaign columns for display"""
+    display_df = campaigns_df.assign(
+        status=budget_status(campaigns_df['budget_amount'], high_threshold, very_high_threshold)
+    )[list(CAMPAIGN_DISPLAY_COLUMNS)]
+    return display_df.rename(columns=CAMPAIGN_DISPLAY_COLUMNS)
+
+# Anomaly card markup - kept on one line so joined cards stay a single markdown HTML block
+ANOMALY_CARD_TEMPLATE = (
+    '<div class="alert-box {alert_class}">'
+    '<strong>{anomaly_type}</strong> - {account_name} - {campaign_name}<br>'
+    '<span style="color: #94a3b8;">{message}</span><br>'
+    '<small style="color: #64748b;">Detected: {detected} | Risk Score: {risk_score:.1f}</small>'
+    '</div>'
+)
+
+def render_zombie_cards(campaigns, alert_class, budget_color, describe_adsets):
+    """Render one severity group of zombie campaigns as a single markdown element"""
+    # Cards are kept on single lines - indented or blank lines would break the markdown HTML block
+    cards = [
+        f'<div class="alert-box {alert_class}">'
+        f'<strong>{campaign.campaign_name}</strong> - {campaign.account_name}<br>'
+        f'<span style="color: {budget_color}; font-weight: bold;">Budget: ${campaign.budget_amount:,.2f} {campaign.budget_type}</span><br>'
+        f'<span style="color: #94a3b8;">{campaign.delivery_status_simple} | {describe_adsets(campaign)}</span>'
+        '</div>'
+        for campaign in campaigns.itertuples(index=False)
+    ]
+    st.markdown("".join(cards), unsafe_allow_html=True)
+
+# Figures are cached on the dataframe contents (st.cache_data hashes frames with
+# pandas' hash_pandas_object), so unchanged results skip rebuilding the chart
+@st.cache_data(ttl=300, show_spinner=False)
+def build_lifetime_fig(lifetime_df):
+    """Build the top lifetime budget campaigns chart (lifetime vs effective daily)"""
+    # Calculate effective daily budget for lifetime campaigns
+    # Spread over the campaign duration, or a 30-day month when the duration is unknown
+    # (the query returns only the top 10, so the arrays feed the chart directly)
+    campaign_names = lifetime_df['campaign_name'].to_numpy()
+    lifetime_budgets = lifetime_df['budget_amount'].to_numpy(dtype=float)
+    duration_days = lifetime_df['campaign_duration_days'].to_numpy(dtype=float, na_value=np.nan)
+    effective_daily_budgets = lifetime_budgets / np.where(duration_days > 0, duration_days, 30)
+
+    # Show top lifetime budget campaigns with their effective daily spend
+    fig = go.Figure()
+
+    # Bar chart showing lifetime budgets and effective daily
+    fig.add_trace(go.Bar(
+        x=campaign_names,
+        y=lifetime_budgets,
+        name='Lifetime Budget',
+        marker_color='#ff6b6b',
+        hovertemplate='%{x}<br>Lifetime: $%{y:,.0f}<extra></extra>'
+    ))
+
+    fig.add_trace(go.Bar(
+        x=campaign_names,
+        y=effective_daily_budgets,
+        name='Effective Daily',
+        marker_color='#4da3ff',
+        hovertemplate='%{x}<br>Daily: $%{y:,.0f}<extra></extra>',
+        yaxis='y2'
+    ))
+
+    fig.update_layout(
+        title="Top 10 Lifetime Budget Campaigns",
+        xaxis_title="Campaign",
+        yaxis_title="Lifetime Budget ($)",
+        yaxis2=dict(
+            title="Effective Daily Budget ($)",
+            overlaying='y',
+            side='right',
+            showgrid=False
+        ),
+        **COMMON_LAYOUT,
+        margin=dict(l=0, r=60, t=40, b=100),
+        xaxis={'tickangle': -45},
+        hovermode='x unified',
+        barmode='group',
+        legend=COMMON_LEGEND
+    )
+
+    return fig
+
+@st.cache_data(ttl=300, show_spinner=False)
+def build_top_accounts_fig(top_df):
+    """Build the stacked daily / lifetime (÷30) chart for the top accounts"""
+    # Create stacked bar chart
+    account_names = top_df['account_name'].to_numpy()
+    fig = go.Figure()
+
+    fig.add_trace(go.Bar(
+        y=account_names,
+        x=top_df['daily_budget'].to_numpy(dtype=float),
+        name='Daily Budget',
+        orientation='h',
+        marker_color='#4da3ff',
+        hovertemplate='%{y}<br>Daily: $%{x:,.0f}<br>Campaigns: %{customdata}<extra></extra>',
+        customdata=top_df['daily_campaigns'].to_numpy()
+    ))
+
+    fig.add_trace(go.Bar(
+        y=account_names,
+        x=top_df['lifetime_budget_daily_equiv'].to_numpy(dtype=float),
+        name='Lifetime (÷30)',
+        orientation='h',
+        marker_color='#ff6b6b',
+        hovertemplate='%{y}<br>Lifetime÷30: $%{x:,.0f}<br>Total Lifetime: $%{customdata:,.0f}<extra></extra>',
+        customdata=top_df['lifetime_budget'].to_numpy(dtype=float)
+    ))
+
+    fig.update_layout(
+        title="Top Accounts by Estimated Daily Spend",
+        xaxis_title="Estimated Daily Spend ($)",
+        yaxis_title="Account",
+        **COMMON_LAYOUT,
+        margin=dict(l=0, r=0, t=40, b=0),
+        xaxis=dict(gridcolor='#2d3748'),
+        yaxis=dict(gridcolor='#2d3748'),
+        barmode='stack',
+        legend=dict(COMMON_LEGEND, xanchor="right", x=0.99)
+    )
+
+    return fig
 
 # Custom spinner with loader GIF
 @contextlib.contextmanager
 def custom_spinner(message="Loading..."):
     """Display a custom spinner with the loader GIF"""
-    loader_path = os.path.join(os.path.dirname(__file__), "loader.gif")
+    loader_uri = get_image_data_uri("loader.gif", "image/gif")
     placeholder = st.empty()
     
     try:
-        if os.path.exists(loader_path):
-            with open(loader_path, "rb") as f:
-                loader_data = base64.b64encode(f.read()).decode()
-            
+        if loader_uri:
             placeholder.markdown(f"""
             <div style="position: fixed; top: 0; left: 0; width: 100vw; height: 100vh; 
                         background: rgba(14, 17, 23, 0.8); z-index: 99999;">
                 <div style="position: fixed; top: 50%; left: 50%; transform: translate(-50%, -50%); 
                             text-align: center;">
-                    <img src="data:image/gif;base64,{loader_data}" style="width: 150px; height: 150px;">
+                    <img src="{loader_uri}" style="width: 150px; height: 150px;">
                     <div style="color: #4da3ff; font-weight: 600; font-size: 1.25rem; margin-top: 1rem;">{message}</div>
                 </div>
             </div>
@@ -802,52 +410,18 @@ def custom_spinner(message="Loading..."):
         placeholder.empty()
 
 # Header with logo support - Professional version
-def display_header():
-    # Get actual data timestamp
-    data_timestamp = get_latest_data_timestamp()
-    
-    # Convert UTC timestamp from BigQuery to PST for display
-    if isinstance(data_timestamp, (datetime, pd.Timestamp)):
-        # Convert to datetime if it's a pandas Timestamp
-        if isinstance(data_timestamp, pd.Timestamp):
-            data_timestamp = data_timestamp.to_pydatetime()
-        
-        # BigQuery returns UTC timestamps as timezone-naive, so we need to localize
-        if data_timestamp.tzinfo is None:
-            # Localize as UTC first
-            utc = pytz.UTC
-            data_timestamp = utc.localize(data_timestamp)
-        
-        # Convert to PST
-        pst = pytz.timezone('America/Los_Angeles')
-        data_timestamp_pst = data_timestamp.astimezone(pst)
-        
-        # Format the PST time
-        formatted_time = data_timestamp_pst.strftime('%I:%M %p PST')
-        
-        # Calculate how long ago using PST times
-        now_pst = datetime.now(pst)
-        time_diff = now_pst - data_timestamp_pst
-        minutes_ago = int(time_diff.total_seconds() / 60)
-        
-        if minutes_ago < 1:
-            time_ago = "just now"
-        elif minutes_ago == 1:
-            time_ago = "1 minute ago"
-        elif minutes_ago < 60:
-            time_ago = f"{minutes_ago} minutes ago"
-        else:
-            hours_ago = minutes_ago // 60
-            time_ago = f"{hours_ago} hour{'s' if hours_ago > 1 else ''} ago"
+def display_header(formatted_time, time_ago):
+    # Use logo if it exists, otherwise fall back to the emoji
+    logo_uri = get_image_data_uri("logo.png", "image/png")
+    if logo_uri:
+        logo_tag = f'<img src="{logo_uri}" class="dashboard-logo" alt="Logo">'
     else:
-        formatted_time = datetime.now().strftime('%I:%M %p PST')
-        time_ago = ""
+        logo_tag = '<div style="font-size: 2.5rem;">💰</div>'
     
-    # Default header without logo
     header_html = f"""
     <div class="dashboard-header">
         <div class="dashboard-header-left">
-            <div style="font-size: 2.5rem;">💰</div>
+            {logo_tag}
             <div>
                 <h1 class="dashboard-title">Meta Ads Budget Monitor</h1>
                 <div class="dashboard-subtitle">Real-time campaign budget tracking & analytics</div>
@@ -863,133 +437,9 @@ def display_header():
     </div>
     """
     
-    # Try to load logo if it exists
-    logo_path = os.path.join(os.path.dirname(__file__), "logo.png")
-    if os.path.exists(logo_path):
-        try:
-            with open(logo_path, "rb") as f:
-                logo_data = base64.b64encode(f.read()).decode()
-            header_html = f"""
-            <div class="dashboard-header">
-                <div class="dashboard-header-left">
-                    <img src="data:image/png;base64,{logo_data}" class="dashboard-logo" alt="Logo">
-                    <div>
-                        <h1 class="dashboard-title">Meta Ads Budget Monitor</h1>
-                        <div class="dashboard-subtitle">Real-time campaign budget tracking & analytics</div>
-                    </div>
-                </div>
-                <div class="dashboard-header-right" style="display: flex; align-items: center; gap: 1rem;">
-                    <div>
-                        <div class="last-updated">Data updated</div>
-                        <div class="update-time">{formatted_time}</div>
-                        {f'<div style="font-size: 0.75rem; color: #64748b; margin-top: 0.25rem;">{time_ago}</div>' if time_ago else ''}
-                    </div>
-                </div>
-            </div>
-            """
-        except:
-            pass
-    
     st.markdown(header_html, unsafe_allow_html=True)
 
 
-# Display header
-display_header()
-
-# Initialize help modal state
-if 'show_help' not in st.session_state:
-    st.session_state.show_help = False
-
-# Add help button right after header
-col1, col2, col3 = st.columns([6, 3, 1])
-with col3:
-    if st.button("❓", key="help_button", help="View documentation", type="secondary"):
-        st.session_state.show_help = not st.session_state.show_help
-
-# Show help modal if active
-if st.session_state.show_help:
-    # Create modal-like container
-    with st.container():
-        st.markdown("---")
-        st.markdown("## 📚 Help & Documentation")
-        
-        # Create tabs for different help sections
-        help_tabs = st.tabs(["🧟 Zombie Campaigns", "💰 Budget Thresholds", "📊 Metrics", "🚨 Anomalies", "💡 Tips"])
-        
-        with help_tabs[0]:
-            st.markdown("### What are Zombie Campaigns?")
-            st.info("Zombie campaigns are active campaigns with allocated budgets that cannot deliver ads effectively. They consume budget allocation without generating results.")
-            
-            st.markdown("**Common causes:**")
-            st.markdown("""
-            - No active ad sets in the campaign
-            - Ad sets exist but are paused  
-            - Ad sets have no ads
-            - All ads are paused or disapproved
-            - Technical issues preventing delivery
-            """)
-        
-        with help_tabs[1]:
-            st.markdown("### Budget Thresholds")
-            
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.success("**💵 Normal Budget (Green)**  \nCampaigns with daily budgets below the HIGH threshold. These are considered standard spend levels.")
-            with col2:
-                st.warning("**⚠️ HIGH Budget (Orange)**  \nCampaigns exceeding the first threshold but below the VERY HIGH threshold. Requires monitoring.")
-            with col3:
-                st.error("**🚨 VERY HIGH Budget (Red)**  \nCampaigns exceeding the maximum threshold. These need immediate attention to prevent overspending.")
-        
-        with help_tabs[2]:
-            st.markdown("### Key Metrics Explained")
-            
-            col1, col2 = st.columns(2)
-            with col1:
-                st.markdown("**👥 Total Accounts**")
-                st.caption("Number of unique Meta ad accounts being monitored")
-                
-                st.markdown("**🎯 Active Campaigns**")
-                st.caption("Campaigns currently in ACTIVE status with allocated budgets")
-                
-            with col2:
-                st.markdown("**💵 Total Daily Budget**")
-                st.caption("Sum of all daily budgets across active campaigns")
-                
-                st.markdown("**⚠️ High Budget Campaigns**")
-                st.caption("Count of campaigns exceeding the HIGH threshold")
-        
-        with help_tabs[3]:
-            st.markdown("### Anomaly Detection")
-            
-            st.error("**CRITICAL Anomalies**  \nMajor budget changes or issues requiring immediate action (e.g., 200%+ budget increase)")
-            st.warning("**WARNING Anomalies**  \nModerate changes that should be reviewed (e.g., 50-200% budget increase)")
-            st.info("**Risk Score**  \nA numerical score (0-10) indicating the severity of the anomaly. Higher scores = higher risk.")
-            
-            st.markdown("### Delivery Status Indicators")
-            col1, col2 = st.columns(2)
-            with col1:
-                st.markdown("🟢 **Green Status** - Campaign is delivering normally")
-                st.markdown("🟡 **Yellow Status** - Some delivery issues")
-            with col2:
-                st.markdown("🟠 **Orange Status** - Significant delivery problems")
-                st.markdown("🔴 **Red Status** - Critical issue, cannot deliver")
-        
-        with help_tabs[4]:
-            st.markdown("### Tips & Best Practices")
-            st.markdown("""
-            - ✅ Review zombie campaigns daily to avoid wasted budget allocation
-            - ✅ Set appropriate budget thresholds based on your typical spend levels
-            - ✅ Investigate anomalies promptly to catch accidental budget changes
-            - ✅ Use filters to focus on specific accounts or budget ranges
-            - ✅ Monitor the "Days Active" metric to identify long-running high-budget campaigns
-            """)
-        
-        # Add close button
-        st.markdown("---")
-        if st.button("✕ Close Help", key="close_help", type="primary"):
-            st.session_state.show_help = False
-            st.rerun()
-
 # Sidebar configuration
 with st.sidebar:
     
@@ -1010,22 +460,29 @@ with st.sidebar:
             max_value=datetime.now().date()
         )
     
-    # Account selection
+    # Header freshness - failures raise out of the cached readers, so they are not cached
     try:
-        accounts_query = f"""
-        SELECT DISTINCT account_name
-        FROM `{project_id}.{dataset_id}.meta_campaign_snapshots`
-        WHERE DATE(snapshot_timestamp) BETWEEN '{start_date}' AND '{end_date}'
-        ORDER BY account_name
-        """
-        accounts_df = client.query(accounts_query).to_dataframe()
-        
+        latest_snapshot_time = get_latest_snapshot_time()
+    except Exception as e:
+        st.warning(f"Could not fetch data freshness: {str(e)}")
+        latest_snapshot_time = None
+    formatted_time, time_ago = describe_data_freshness(latest_snapshot_time)
+    
+    # Account options are fetched on the script thread so Streamlit's cache has its run context
+    try:
+        account_names = get_account_names(start_date, end_date)
+    except Exception as e:
+        st.warning(f"Could not fetch account list: {str(e)}")
+        account_names = None
+    
+    # Account selection
+    if account_names is not None:
         selected_accounts = st.multiselect(
             "Select Accounts",
-            options=accounts_df['account_name'].tolist(),
+            options=account_names,
             help="Leave empty to view all accounts"
         )
-    except:
+    else:
         selected_accounts = []
         st.info("No account data available")
     
@@ -1065,76 +522,309 @@ with st.sidebar:
     
     st.markdown("---")
     
-    # Campaign filtering options
-    st.markdown("### 🎯 Campaign Filters")
-    col1, col2 = st.columns(2)
-    with col1:
-        show_high_budget = st.checkbox(
-            "Show HIGH budget",
-            value=True,
-            help=f"${high_budget_threshold:,.0f} - ${very_high_budget_threshold:,.0f}"
-        )
-    with col2:
-        show_very_high_budget = st.checkbox(
-            "Show VERY HIGH budget",
-            value=True,
-            help=f"Above ${very_high_budget_threshold:,.0f}"
-        )
-    
-    show_normal_budget = st.checkbox(
-        "Show Normal budget",
-        value=True,
-        help=f"Below ${high_budget_threshold:,.0f}"
-    )
-    
-    st.markdown("---")
-    
     # Refresh button
     if st.button("🔄 Refresh Data", type="primary", use_container_width=True):
-        st.cache_data.clear()
+        # Only the BigQuery reads need refetching; cached figures are keyed on their data
+        run_query.clear()
+        get_account_names.clear()
+        get_latest_snapshot_time.clear()
         st.rerun()
 
-# Build filter clause
-account_filter = ""
-if selected_accounts:
-    accounts_str = ', '.join([f"'{acc}'" for acc in selected_accounts])
-    account_filter = f"AND account_name IN ({accounts_str})"
+# Display header
+display_header(formatted_time, time_ago)
 
-# Main content area - Summary metrics
-# Initialize session state for loading
-if 'data_loaded' not in st.session_state:
-    st.session_state.data_loaded = False
+# Snapshot-day views read the newest refreshed day: after midnight (PST) today's partition stays
+# empty until the next scheduled refresh, so fall back to the day of the latest snapshot
+today_pst = datetime.now(PST).date()
+snapshot_date = latest_snapshot_time.astimezone(PST).date() if latest_snapshot_time is not None else today_pst
+if snapshot_date < today_pst:
+    st.info(f"🔄 Today's data is still refreshing - showing the latest snapshots, from {snapshot_date:%b %d}.")
 
-col1, col2, col3, col4 = st.columns(4)
+# Initialize help modal state
+if 'show_help' not in st.session_state:
+    st.session_state.show_help = False
 
-try:
-    # Get summary metrics
-    with custom_spinner("Loading dashboard metrics..."):
-        metrics_query = f"""
-    WITH latest AS (
-        SELECT 
-            campaign_id,
-            account_name,
-            budget_amount,
-            budget_type,
-            ROW_NUMBER() OVER (PARTITION BY campaign_id ORDER BY snapshot_timestamp DESC) as rn
-        FROM `{project_id}.{dataset_id}.meta_campaign_snapshots`
-        WHERE DATE(DATETIME(snapshot_timestamp, "America/Los_Angeles")) = CURRENT_DATE("America/Los_Angeles")
-        {account_filter}
-    )
-    SELECT 
+# Help button and modal run as a fragment so toggling them doesn't rerun the whole page
+@st.fragment
+def render_help():
+    """Render the help toggle button and, when open, the documentation panel"""
+    col1, col2, col3 = st.columns([6, 3, 1])
+    with col3:
+        if st.button("❓", key="help_button", help="View documentation", type="secondary"):
+            st.session_state.show_help = not st.session_state.show_help
+
+    # Show help modal if active
+    if st.session_state.show_help:
+        # Create modal-like container
+        with st.container():
+            st.markdown("---")
+            st.markdown("## 📚 Help & Documentation")
+        
+            # Create tabs for different help sections
+            help_tabs = st.tabs(["🧟 Zombie Campaigns", "💰 Budget Thresholds", "📊 Metrics", "🚨 Anomalies", "💡 Tips"])
+        
+            with help_tabs[0]:
+                st.markdown("### What are Zombie Campaigns?")
+                st.info("Zombie campaigns are active campaigns with allocated budgets that cannot deliver ads effectively. They consume budget allocation without generating results.")
+            
+                st.markdown("**Common causes:**")
+                st.markdown("""
+                - No active ad sets in the campaign
+                - Ad sets exist but are paused  
+                - Ad sets have no ads
+                - All ads are paused or disapproved
+                - Technical issues preventing delivery
+                """)
+        
+            with help_tabs[1]:
+                st.markdown("### Budget Thresholds")
+            
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.success("**💵 Normal Budget (Green)**  \nCampaigns with daily budgets below the HIGH threshold. These are considered standard spend levels.")
+                with col2:
+                    st.warning("**⚠️ HIGH Budget (Orange)**  \nCampaigns exceeding the first threshold but below the VERY HIGH threshold. Requires monitoring.")
+                with col3:
+                    st.error("**🚨 VERY HIGH Budget (Red)**  \nCampaigns exceeding the maximum threshold. These need immediate attention to prevent overspending.")
+        
+            with help_tabs[2]:
+                st.markdown("### Key Metrics Explained")
+            
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.markdown("**👥 Total Accounts**")
+                    st.caption("Number of unique Meta ad accounts being monitored")
+                
+                    st.markdown("**🎯 Active Campaigns**")
+                    st.caption("Campaigns currently in ACTIVE status with allocated budgets")
+                
+                with col2:
+                    st.markdown("**💵 Total Daily Budget**")
+                    st.caption("Sum of all daily budgets across active campaigns")
+                
+                    st.markdown("**⚠️ High Budget Campaigns**")
+                    st.caption("Count of campaigns exceeding the HIGH threshold")
+        
+            with help_tabs[3]:
+                st.markdown("### Anomaly Detection")
+            
+                st.error("**CRITICAL Anomalies**  \nMajor budget changes or issues requiring immediate action (e.g., 200%+ budget increase)")
+                st.warning("**WARNING Anomalies**  \nModerate changes that should be reviewed (e.g., 50-200% budget increase)")
+                st.info("**Risk Score**  \nA numerical score (0-10) indicating the severity of the anomaly. Higher scores = higher risk.")
+            
+                st.markdown("### Delivery Status Indicators")
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.markdown("🟢 **Green Status** - Campaign is delivering normally")
+                    st.markdown("🟡 **Yellow Status** - Some delivery issues")
+                with col2:
+                    st.markdown("🟠 **Orange Status** - Significant delivery problems")
+                    st.markdown("🔴 **Red Status** - Critical issue, cannot deliver")
+        
+            with help_tabs[4]:
+                st.markdown("### Tips & Best Practices")
+                st.markdown("""
+                - ✅ Review zombie campaigns daily to avoid wasted budget allocation
+                - ✅ Set appropriate budget thresholds based on your typical spend levels
+                - ✅ Investigate anomalies promptly to catch accidental budget changes
+                - ✅ Use filters to focus on specific accounts or budget ranges
+                - ✅ Monitor the "Days Active" metric to identify long-running high-budget campaigns
+                """)
+        
+            # Add close button
+            st.markdown("---")
+            if st.button("✕ Close Help", key="close_help", type="primary"):
+                st.session_state.show_help = False
+                st.rerun(scope="fragment")
+
+render_help()
+
+# Build filter clause - an empty @accounts array means all accounts
+account_filter = "AND (ARRAY_LENGTH(@accounts) = 0 OR account_name IN UNNEST(@accounts))"
+accounts_param = ("accounts", "STRING", tuple(selected_accounts))
+date_params = (("start_date", "DATE", start_date), ("end_date", "DATE", end_date))
+min_budget_param = ("min_budget", "FLOAT64", float(min_budget))
+snapshot_date_param = ("snapshot_date", "DATE", snapshot_date)
+
+# Page queries - the SQL text is fixed and every filter is bound as a parameter
+metrics_query = f"""
+    SELECT
         COUNT(DISTINCT account_name) as total_accounts,
         COUNT(DISTINCT campaign_id) as total_campaigns,
         SUM(CASE WHEN budget_type = 'daily' THEN budget_amount ELSE 0 END) as total_daily_budget,
         SUM(CASE WHEN budget_type = 'lifetime' THEN budget_amount ELSE 0 END) as total_lifetime_budget,
+        SUM(CASE WHEN budget_type = 'lifetime' THEN budget_amount ELSE 0 END) / 30 as est_lifetime_daily_budget,
         COUNT(DISTINCT CASE WHEN budget_type = 'daily' THEN campaign_id END) as daily_campaigns,
         COUNT(DISTINCT CASE WHEN budget_type = 'lifetime' THEN campaign_id END) as lifetime_campaigns,
-        COUNT(DISTINCT CASE WHEN budget_amount >= {high_budget_threshold} THEN campaign_id END) as high_budget_campaigns
-    FROM latest
-    WHERE rn = 1
+        COUNT(DISTINCT CASE WHEN budget_amount >= @high_budget_threshold THEN campaign_id END) as high_budget_campaigns
+    FROM {latest_view}
+    WHERE snapshot_date = @snapshot_date
+    {account_filter}
     """
-    
-        metrics = client.query(metrics_query).to_dataframe().iloc[0]
+
+campaigns_query = f"""
+    SELECT
+        account_name,
+        campaign_name,
+        budget_amount,
+        budget_type,
+        objective,
+        -- Display dates and age are derived here so pandas never parses the timestamps;
+        -- DATE columns reach the browser as Arrow date32 and are formatted by column_config
+        DATE(created_time) as created_date,
+        DATE(start_time) as start_date,
+        DATE(stop_time) as end_date,
+        IFNULL(TIMESTAMP_DIFF(CURRENT_TIMESTAMP(), created_time, DAY), 0) as days_active,
+        delivery_status_simple,
+        -- Unified view summary stats over every returned campaign
+        COUNTIF(budget_amount >= @high_budget_threshold) OVER () as high_risk_campaigns,
+        AVG(IFNULL(TIMESTAMP_DIFF(CURRENT_TIMESTAMP(), created_time, DAY), 0)) OVER () as avg_days_active
+    FROM {latest_view}
+    WHERE snapshot_date = @snapshot_date
+    AND budget_amount >= @min_budget
+    AND (
+        (@show_normal_budget AND budget_amount < @high_budget_threshold)
+        OR (@show_high_budget AND budget_amount >= @high_budget_threshold AND budget_amount < @very_high_budget_threshold)
+        OR (@show_very_high_budget AND budget_amount >= @very_high_budget_threshold)
+    )
+    {account_filter}
+    ORDER BY account_name, budget_amount DESC
+    """
+
+trends_query = f"""
+    SELECT
+        snapshot_date as date,
+        SUM(CASE WHEN budget_type = 'daily' THEN budget_amount ELSE 0 END) as total_daily_budget,
+        SUM(CASE WHEN budget_type = 'lifetime' THEN budget_amount ELSE 0 END) as total_lifetime_budget,
+        COUNT(DISTINCT CASE WHEN budget_type = 'daily' THEN campaign_id END) as daily_campaign_count,
+        COUNT(DISTINCT CASE WHEN budget_type = 'lifetime' THEN campaign_id END) as lifetime_campaign_count
+    FROM {latest_view}
+    WHERE snapshot_date BETWEEN @start_date AND @end_date
+    {account_filter}
+    GROUP BY date
+    ORDER BY date
+    """
+
+lifetime_query = f"""
+    SELECT
+        campaign_name,
+        budget_amount,
+        CASE
+            WHEN stop_time IS NOT NULL THEN DATE_DIFF(DATE(stop_time), DATE(start_time), DAY)
+            ELSE DATE_DIFF(CURRENT_DATE(), DATE(start_time), DAY)
+        END as campaign_duration_days
+    FROM {latest_view}
+    WHERE snapshot_date = @snapshot_date
+    AND budget_type = 'lifetime'
+    {account_filter}
+    ORDER BY budget_amount DESC
+    LIMIT 10
+    """
+
+top_accounts_query = f"""
+    SELECT
+        account_name,
+        SUM(CASE WHEN budget_type = 'daily' THEN budget_amount ELSE 0 END) as daily_budget,
+        SUM(CASE WHEN budget_type = 'lifetime' THEN budget_amount ELSE 0 END) as lifetime_budget,
+        -- Lifetime budgets shown as a daily equivalent in the stacked chart
+        SUM(CASE WHEN budget_type = 'lifetime' THEN budget_amount ELSE 0 END) / 30 as lifetime_budget_daily_equiv,
+        COUNT(DISTINCT CASE WHEN budget_type = 'daily' THEN campaign_id END) as daily_campaigns,
+        COUNT(DISTINCT CASE WHEN budget_type = 'lifetime' THEN campaign_id END) as lifetime_campaigns
+    FROM {latest_view}
+    WHERE snapshot_date = @snapshot_date
+    GROUP BY account_name
+    ORDER BY (daily_budget + lifetime_budget_daily_equiv) DESC
+    LIMIT 10
+    """
+
+anomalies_query = f"""
+    SELECT
+        detected_at,
+        anomaly_type,
+        account_name,
+        campaign_name,
+        message,
+        risk_score
+    FROM `{project_id}.{dataset_id}.meta_anomalies`
+    WHERE detected_at >= TIMESTAMP(@start_date)
+    AND detected_at < TIMESTAMP(DATE_ADD(@end_date, INTERVAL 1 DAY))
+    {account_filter}
+    ORDER BY detected_at DESC
+    LIMIT 50
+    """
+
+zombie_query = f"""
+    SELECT
+        account_name,
+        campaign_name,
+        budget_amount,
+        budget_type,
+        delivery_status_simple,
+        total_adsets,
+        active_adsets,
+        adsets_with_active_ads,
+        delivery_severity,
+        -- Totals are computed over every match, before the LIMIT
+        COUNT(*) OVER () as total_zombies,
+        SUM(CASE WHEN budget_type = 'daily' THEN budget_amount ELSE 0 END) OVER () as total_daily_waste
+    FROM {latest_view}
+    WHERE snapshot_date = @snapshot_date
+        AND campaign_status = 'ACTIVE'
+        {account_filter}
+        AND delivery_severity >= 2
+        AND budget_amount >= @min_budget
+    ORDER BY delivery_severity DESC, budget_amount DESC
+    LIMIT 50
+    """
+
+def campaigns_query_params(show_normal_budget, show_high_budget, show_very_high_budget):
+    """Parameters for campaigns_query - the budget level checkboxes filter campaigns server-side"""
+    return (
+        accounts_param,
+        snapshot_date_param,
+        min_budget_param,
+        ("high_budget_threshold", "FLOAT64", float(high_budget_threshold)),
+        ("very_high_budget_threshold", "FLOAT64", float(very_high_budget_threshold)),
+        ("show_normal_budget", "BOOL", show_normal_budget),
+        ("show_high_budget", "BOOL", show_high_budget),
+        ("show_very_high_budget", "BOOL", show_very_high_budget),
+    )
+
+page_queries = {
+    "metrics": (metrics_query, (accounts_param, snapshot_date_param, ("high_budget_threshold", "FLOAT64", float(high_budget_threshold)))),
+    "trends": (trends_query, (accounts_param, *date_params)),
+    "lifetime": (lifetime_query, (accounts_param, snapshot_date_param)),
+    "anomalies": (anomalies_query, (accounts_param, *date_params)),
+    "zombies": (zombie_query, (accounts_param, snapshot_date_param, min_budget_param)),
+}
+# The budget level checkboxes live in the campaigns tab fragment; prefetch with their current
+# state so a full rerun fetches campaigns alongside everything else (none ticked - nothing to fetch)
+budget_levels = tuple(
+    st.session_state.get(key, True)
+    for key in ("show_normal_budget", "show_high_budget", "show_very_high_budget")
+)
+if any(budget_levels):
+    page_queries["campaigns"] = (campaigns_query, campaigns_query_params(*budget_levels))
+if not selected_accounts:
+    page_queries["top_accounts"] = (top_accounts_query, (snapshot_date_param,))
+
+# Submit every page query up front so the page waits for the slowest one rather than the sum;
+# each tab reads its future inside its own try block, so a failing query only breaks that tab
+query_executor = get_query_executor(max_workers=len(page_queries))
+page_results = {
+    name: query_executor.submit(run_query, sql, params)
+    for name, (sql, params) in page_queries.items()
+}
+# Everything is submitted - release the workers as they finish without blocking the script
+query_executor.shutdown(wait=False)
+
+# Main content area - Summary metrics
+col1, col2, col3, col4 = st.columns(4)
+
+try:
+    # Get summary metrics
+    with custom_spinner("Loading dashboard metrics..."):
+        metrics = page_results["metrics"].result().iloc[0]
     
     with col1:
         total_accounts = metrics.get('total_accounts', 0) or 0
@@ -1175,8 +865,10 @@ st.markdown("---")
 # Tabs for different views
 tab1, tab2, tab3, tab4 = st.tabs(["💰 Active Campaigns", "📈 Budget Trends", "🚨 Anomalies", "🧟 Delivery Issues"])
 
-# Tab 1: Active Campaigns
-with tab1:
+# Tab 1: Active Campaigns - a fragment, so switching the view mode or budget filters reruns only this tab
+@st.fragment
+def render_active_campaigns():
+    """Render the campaigns tab, reusing the prefetched campaigns query while the filters match it"""
     st.markdown("### Active Campaigns by Account")
     
     # Budget level legend
@@ -1196,15 +888,38 @@ with tab1:
             ["Grouped by Account", "Unified Table"],
             help="Choose how to display campaigns"
         )
+    with col2:
+        filter_cols = st.columns(3)
+        with filter_cols[0]:
+            show_normal_budget = st.checkbox(
+                "Show Normal budget",
+                value=True,
+                key="show_normal_budget",
+                help=f"Below ${high_budget_threshold:,.0f}"
+            )
+        with filter_cols[1]:
+            show_high_budget = st.checkbox(
+                "Show HIGH budget",
+                value=True,
+                key="show_high_budget",
+                help=f"${high_budget_threshold:,.0f} - ${very_high_budget_threshold:,.0f}"
+            )
+        with filter_cols[2]:
+            show_very_high_budget = st.checkbox(
+                "Show VERY HIGH budget",
+                value=True,
+                key="show_very_high_budget",
+                help=f"Above ${very_high_budget_threshold:,.0f}"
+            )
     
     # Show filter status if active
-    active_filters = []
-    if show_normal_budget:
-        active_filters.append("Normal")
-    if show_high_budget:
-        active_filters.append("HIGH")
-    if show_very_high_budget:
-        active_filters.append("VERY HIGH")
+    active_filters = [
+        label for label, shown in (
+            ("Normal", show_normal_budget),
+            ("HIGH", show_high_budget),
+            ("VERY HIGH", show_very_high_budget),
+        ) if shown
+    ]
     
     if active_filters and len(active_filters) < 3:
         st.info(f"🔍 **Filter Active:** Showing {', '.join(active_filters)} budget campaigns")
@@ -1212,125 +927,30 @@ with tab1:
         st.warning("⚠️ No budget filters selected. Please select at least one filter to view campaigns.")
     
     try:
-        with custom_spinner("Loading campaign data..."):
-            campaigns_query = f"""
-        WITH latest AS (
-            SELECT 
-                account_name,
-                campaign_id,
-                campaign_name,
-                budget_amount,
-                budget_type,
-                objective,
-                created_time,
-                start_time,
-                stop_time,
-                delivery_status_simple,
-                total_adsets,
-                active_adsets,
-                adsets_with_active_ads,
-                ROW_NUMBER() OVER (PARTITION BY campaign_id ORDER BY snapshot_timestamp DESC) as rn
-            FROM `{project_id}.{dataset_id}.meta_campaign_snapshots`
-            WHERE DATE(DATETIME(snapshot_timestamp, "America/Los_Angeles")) = CURRENT_DATE("America/Los_Angeles")
-            AND budget_amount >= {min_budget}
-            {account_filter}
-        )
-        SELECT 
-            account_name,
-            campaign_name,
-            budget_amount,
-            budget_type,
-            objective,
-            created_time,
-            start_time,
-            stop_time,
-            delivery_status_simple,
-            total_adsets,
-            active_adsets,
-            adsets_with_active_ads
-        FROM latest 
-        WHERE rn = 1
-        ORDER BY account_name, budget_amount DESC
-        """
-        
-            campaigns_df = client.query(campaigns_query).to_dataframe()
-            import time
-            time.sleep(0.5)  # Brief delay to show loader
+        campaigns_params = campaigns_query_params(show_normal_budget, show_high_budget, show_very_high_budget)
+        if not active_filters:
+            # No budget level selected - nothing to fetch
+            campaigns_df = pd.DataFrame()
+        elif page_queries.get("campaigns") == (campaigns_query, campaigns_params):
+            with custom_spinner("Loading campaign data..."):
+                campaigns_df = page_results["campaigns"].result()
+        else:
+            # Filters changed inside the fragment since the page-level prefetch
+            with custom_spinner("Loading campaign data..."):
+                campaigns_df = run_query(campaigns_query, campaigns_params)
         
-        # Apply budget filters if selected
         if len(campaigns_df) > 0:
-            # Create filter conditions based on checkboxes
-            filter_conditions = []
-            
-            if show_normal_budget:
-                filter_conditions.append(campaigns_df['budget_amount'] < high_budget_threshold)
-            
-            if show_high_budget:
-                filter_conditions.append(
-                    (campaigns_df['budget_amount'] >= high_budget_threshold) & 
-                    (campaigns_df['budget_amount'] < very_high_budget_threshold)
-                )
+            # Low-cardinality labels as categoricals: integer-coded groupby/comparisons and a
+            # dictionary-encoded Arrow payload for the tables
+            campaigns_df = campaigns_df.astype({column: 'category' for column in CAMPAIGN_CATEGORY_COLUMNS})
             
-            if show_very_high_budget:
-                filter_conditions.append(campaigns_df['budget_amount'] >= very_high_budget_threshold)
+            # Both views show the same formatted columns
+            display_df = format_campaigns(campaigns_df, high_budget_threshold, very_high_budget_threshold)
             
-            # Apply filters if any are selected
-            if filter_conditions:
-                # Combine all conditions with OR
-                combined_filter = filter_conditions[0]
-                for condition in filter_conditions[1:]:
-                    combined_filter = combined_filter | condition
-                campaigns_df = campaigns_df[combined_filter]
-            else:
-                # If no filters selected, show empty dataframe
-                campaigns_df = campaigns_df.iloc[0:0]
-        
-        if len(campaigns_df) > 0:
             if view_mode == "Unified Table":
                 # Unified view - all campaigns in one table
                 st.markdown("### All Campaigns - Sortable by Any Column")
                 
-                # Prepare display dataframe
-                display_df = campaigns_df.copy()
-                
-                # Add status column based on budget amount
-                display_df['status'] = display_df['budget_amount'].apply(
-                    lambda x: '🚨 VERY HIGH' if x >= very_high_budget_threshold 
-                    else '⚠️ HIGH' if x >= high_budget_threshold 
-                    else '✅ Normal'
-                )
-                
-                # Format created date
-                display_df['created_date'] = pd.to_datetime(display_df['created_time'], errors='coerce').dt.strftime('%Y-%m-%d')
-                display_df['created_date'] = display_df['created_date'].fillna('Unknown')
-                
-                # Format start date
-                display_df['start_date'] = pd.to_datetime(display_df['start_time'], errors='coerce').dt.strftime('%Y-%m-%d')
-                display_df['start_date'] = display_df['start_date'].fillna('Not Set')
-                
-                # Format end date
-                display_df['end_date'] = pd.to_datetime(display_df['stop_time'], errors='coerce').dt.strftime('%Y-%m-%d')
-                display_df['end_date'] = display_df['end_date'].fillna('Ongoing')
-                
-                # Calculate days active
-                try:
-                    created_times = pd.to_datetime(display_df['created_time'], errors='coerce')
-                    if created_times.dt.tz is not None:
-                        created_times = created_times.dt.tz_localize(None)
-                    display_df['days_active'] = (datetime.now() - created_times).dt.days
-                    display_df['days_active'] = display_df['days_active'].fillna(0).astype(int)
-                except:
-                    display_df['days_active'] = 0
-                
-                # Select and reorder columns - keep budget_amount for sorting
-                display_df = display_df[['account_name', 'campaign_name', 'budget_amount', 
-                                       'status', 'delivery_status_simple', 'budget_type', 'objective', 
-                                       'created_date', 'start_date', 'end_date', 'days_active']]
-                
-                # Rename columns for display
-                display_df.columns = ['Account', 'Campaign', 'Budget', 'Risk Level', 
-                                    'Delivery', 'Type', 'Objective', 'Created', 'Start Date', 'End Date', 'Days Active']
-                
                 # Sort by budget amount by default (descending)
                 display_df = display_df.sort_values('Budget', ascending=False)
                 
@@ -1367,17 +987,20 @@ with tab1:
                             "Type",
                             help="Budget type (daily/lifetime)"
                         ),
-                        "Created": st.column_config.TextColumn(
+                        "Created": st.column_config.DateColumn(
                             "Created",
+                            format="YYYY-MM-DD",
                             help="Date when campaign was created in Meta Ads"
                         ),
-                        "Start Date": st.column_config.TextColumn(
+                        "Start Date": st.column_config.DateColumn(
                             "Start Date",
+                            format="YYYY-MM-DD",
                             help="Scheduled start date for the campaign"
                         ),
-                        "End Date": st.column_config.TextColumn(
+                        "End Date": st.column_config.DateColumn(
                             "End Date",
-                            help="Scheduled end date for the campaign (Ongoing if no end date set)"
+                            format="YYYY-MM-DD",
+                            help="Scheduled end date for the campaign (empty while ongoing)"
                         ),
                         "Days Active": st.column_config.NumberColumn(
                             "Days Active",
@@ -1394,97 +1017,69 @@ with tab1:
                     st.metric("Total Campaigns", len(display_df))
                 with col2:
                     st.metric("Total Daily Budget", f"${campaigns_df['budget_amount'].sum():,.2f}")
+                # HIGH and VERY HIGH count and the average age come precomputed with every row
+                campaign_stats = campaigns_df.iloc[0]
                 with col3:
-                    high_risk = len(display_df[display_df['Risk Level'].str.contains('HIGH')])
-                    st.metric("High Risk Campaigns", high_risk)
+                    st.metric("High Risk Campaigns", int(campaign_stats['high_risk_campaigns']))
                 with col4:
-                    avg_days = display_df['Days Active'].mean()
-                    st.metric("Avg Days Active", f"{avg_days:.0f}")
+                    st.metric("Avg Days Active", f"{campaign_stats['avg_days_active']:.0f}")
                     
             else:
                 # Grouped view - original implementation
-                # Group by account
-                for account in campaigns_df['account_name'].unique():
-                    account_data = campaigns_df[campaigns_df['account_name'] == account]
-                    daily_budget = account_data[account_data['budget_type'] == 'daily']['budget_amount'].sum()
-                    
-                    # Count high budget campaigns in this account
-                    high_budget_count = len(account_data[account_data['budget_amount'] >= high_budget_threshold])
-                    very_high_budget_count = len(account_data[account_data['budget_amount'] >= very_high_budget_threshold])
-                    
-                    # Create expander header with warning indicators
-                    header = f"**{account}** - {len(account_data)} campaigns - Daily: ${daily_budget:,.2f}"
-                    if very_high_budget_count > 0:
-                        header += f" 🚨 ({very_high_budget_count} very high)"
-                    elif high_budget_count > 0:
-                        header += f" ⚠️ ({high_budget_count} high)"
-                    
-                    with st.expander(header, expanded=(high_budget_count > 0)):
-                        # Format display with enhanced columns
-                        display_df = account_data[['campaign_name', 'budget_amount', 'budget_type', 'objective', 'created_time', 'start_time', 'stop_time']].copy()
-                    
-                        # Add status column based on budget amount
-                        display_df['status'] = display_df['budget_amount'].apply(
-                        lambda x: '🚨 VERY HIGH' if x >= very_high_budget_threshold 
-                        else '⚠️ HIGH' if x >= high_budget_threshold 
-                        else '✅ Normal'
-                        )
-                        
-                        # Format columns
-                        display_df['budget_display'] = display_df['budget_amount'].apply(lambda x: f"${x:,.2f}")
-                    
-                        # Format created date
-                        display_df['created_date'] = pd.to_datetime(display_df['created_time'], errors='coerce').dt.strftime('%Y-%m-%d')
-                        display_df['created_date'] = display_df['created_date'].fillna('Unknown')
-                        
-                        # Format start date
-                        display_df['start_date'] = pd.to_datetime(display_df['start_time'], errors='coerce').dt.strftime('%Y-%m-%d')
-                        display_df['start_date'] = display_df['start_date'].fillna('Not Set')
-                        
-                        # Format end date
-                        display_df['end_date'] = pd.to_datetime(display_df['stop_time'], errors='coerce').dt.strftime('%Y-%m-%d')
-                        display_df['end_date'] = display_df['end_date'].fillna('Ongoing')
-                    
-                        # Calculate days active - handle timezone
-                        try:
-                            # Convert created_time to timezone-naive for calculation
-                            created_times = pd.to_datetime(display_df['created_time'], errors='coerce')
-                            if created_times.dt.tz is not None:
-                                created_times = created_times.dt.tz_localize(None)
-                            display_df['days_active'] = (datetime.now() - created_times).dt.days
-                            display_df['days_active'] = display_df['days_active'].fillna(0).astype(int)
-                        except:
-                            display_df['days_active'] = 0
-                    
-                        # Get delivery status from data if available
-                        if 'delivery_status_simple' in account_data.columns:
-                            display_df['delivery_status'] = account_data['delivery_status_simple']
-                        else:
-                            # Fallback if column doesn't exist yet
-                            display_df['delivery_status'] = display_df['budget_amount'].apply(
-                                lambda x: '⚠️ Check delivery' if x >= high_budget_threshold else '✓ Check delivery'
-                            )
-                    
-                        # Reorder and rename columns
-                        display_df = display_df[['campaign_name', 'budget_display', 'status', 'delivery_status', 'budget_type', 'objective', 'created_date', 'start_date', 'end_date', 'days_active']]
-                        display_df.columns = ['Campaign', 'Budget', 'Risk Level', 'Delivery', 'Type', 'Objective', 'Created', 'Start Date', 'End Date', 'Days Active']
-                    
-                        # Display with custom styling
-                        st.dataframe(
-                            display_df,
-                            use_container_width=True,
-                            hide_index=True,
-                            column_config={
-                                "Budget": st.column_config.TextColumn(
-                                    "Budget",
-                                    help="Daily budget amount"
-                                ),
-                                "Status": st.column_config.TextColumn(
-                                    "Status",
-                                    help="Budget risk level"
-                                )
-                            }
+                # Per-account summary stats computed in one groupby pass
+                budget_amounts = campaigns_df['budget_amount'].to_numpy(dtype=float)
+                account_stats = campaigns_df.assign(
+                    daily_budget=np.where(campaigns_df['budget_type'].eq('daily').to_numpy(dtype=bool, na_value=False), budget_amounts, 0.0),
+                    is_high=budget_amounts >= high_budget_threshold,
+                    is_very_high=budget_amounts >= very_high_budget_threshold
+                ).groupby('account_name', sort=False, observed=True).agg(
+                    campaign_count=('campaign_name', 'size'),
+                    daily_budget=('daily_budget', 'sum'),
+                    high_budget_count=('is_high', 'sum'),
+                    very_high_budget_count=('is_very_high', 'sum')
+                )
+                
+                # One summary row per account instead of an expander per account
+                account_stats['warning'] = np.select(
+                    [account_stats['very_high_budget_count'] > 0, account_stats['high_budget_count'] > 0],
+                    ['🚨 ' + account_stats['very_high_budget_count'].astype(str) + ' very high',
+                     '⚠️ ' + account_stats['high_budget_count'].astype(str) + ' high'],
+                    default=''
+                )
+                st.dataframe(
+                    account_stats.reset_index()[['account_name', 'campaign_count', 'daily_budget', 'warning']],
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={
+                        "account_name": st.column_config.TextColumn("Account"),
+                        "campaign_count": st.column_config.NumberColumn("Campaigns"),
+                        "daily_budget": st.column_config.NumberColumn(
+                            "Daily Budget",
+                            help="Sum of daily budgets in this account",
+                            format="$%.2f"
+                        ),
+                        "warning": st.column_config.TextColumn("Alerts")
+                    }
+                )
+                
+                # All campaigns in a single table - the query already orders rows by account, then budget
+                # Display with custom styling
+                st.dataframe(
+                    display_df,
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={
+                        "Budget": st.column_config.NumberColumn(
+                            "Budget",
+                            help="Daily budget amount",
+                            format="$%.2f"
+                        ),
+                        "Risk Level": st.column_config.TextColumn(
+                            "Risk Level",
+                            help="Budget risk level"
                         )
+                    }
+                )
         else:
             if not active_filters:
                 st.info("Please select at least one budget filter to view campaigns.")
@@ -1494,41 +1089,25 @@ with tab1:
     except Exception as e:
         st.error(f"Error loading campaigns: {str(e)}")
 
+with tab1:
+    render_active_campaigns()
+
 # Tab 2: Budget Trends
 with tab2:
     st.markdown("### Budget Trends Analysis")
     
     try:
-        # Get budget type distribution first
-        budget_type_query = f"""
-        WITH latest AS (
-            SELECT 
-                campaign_id,
-                budget_type,
-                budget_amount,
-                ROW_NUMBER() OVER (PARTITION BY campaign_id ORDER BY snapshot_timestamp DESC) as rn
-            FROM `{project_id}.{dataset_id}.meta_campaign_snapshots`
-            WHERE DATE(DATETIME(snapshot_timestamp, "America/Los_Angeles")) = CURRENT_DATE("America/Los_Angeles")
-            {account_filter}
-        )
-        SELECT 
-            budget_type,
-            COUNT(DISTINCT campaign_id) as campaign_count,
-            SUM(budget_amount) as total_budget
-        FROM latest
-        WHERE rn = 1
-        GROUP BY budget_type
-        """
-        
-        budget_types_df = client.query(budget_type_query).to_dataframe()
+        # Budget type split comes from the summary metrics row - no separate query
+        metrics = page_results["metrics"].result().iloc[0]
         
         # Show budget type summary
         col1, col2, col3 = st.columns(3)
         
-        daily_campaigns = budget_types_df[budget_types_df['budget_type'] == 'daily']['campaign_count'].sum() if len(budget_types_df[budget_types_df['budget_type'] == 'daily']) > 0 else 0
-        lifetime_campaigns = budget_types_df[budget_types_df['budget_type'] == 'lifetime']['campaign_count'].sum() if len(budget_types_df[budget_types_df['budget_type'] == 'lifetime']) > 0 else 0
-        daily_budget_total = budget_types_df[budget_types_df['budget_type'] == 'daily']['total_budget'].sum() if len(budget_types_df[budget_types_df['budget_type'] == 'daily']) > 0 else 0
-        lifetime_budget_total = budget_types_df[budget_types_df['budget_type'] == 'lifetime']['total_budget'].sum() if len(budget_types_df[budget_types_df['budget_type'] == 'lifetime']) > 0 else 0
+        daily_campaigns = metrics.get('daily_campaigns', 0) or 0
+        lifetime_campaigns = metrics.get('lifetime_campaigns', 0) or 0
+        daily_budget_total = metrics.get('total_daily_budget', 0) or 0
+        lifetime_budget_total = metrics.get('total_lifetime_budget', 0) or 0
+        effective_daily = metrics.get('est_lifetime_daily_budget', 0) or 0  # Lifetime budgets over a 30-day average
         
         with col1:
             st.metric("Daily Budget Campaigns", f"{int(daily_campaigns):,}", 
@@ -1537,8 +1116,6 @@ with tab2:
             st.metric("Lifetime Budget Campaigns", f"{int(lifetime_campaigns):,}", 
                      delta=f"${lifetime_budget_total:,.0f} total allocation")
         with col3:
-            # Calculate effective daily spend from lifetime budgets
-            effective_daily = lifetime_budget_total / 30 if lifetime_budget_total > 0 else 0  # Assuming 30-day average
             st.metric("Est. Combined Daily Spend", f"${(daily_budget_total + effective_daily):,.0f}",
                      help="Daily budgets + (Lifetime budgets ÷ 30 days)")
         
@@ -1547,65 +1124,38 @@ with tab2:
         # Combined budget trends
         st.markdown("#### Budget Trends Over Time")
         
-        trends_query = f"""
-        WITH daily_latest AS (
-            SELECT 
-                DATE(DATETIME(snapshot_timestamp, "America/Los_Angeles")) as date,
-                campaign_id,
-                campaign_name,
-                account_name,
-                budget_amount,
-                budget_type,
-                snapshot_timestamp,
-                ROW_NUMBER() OVER (
-                    PARTITION BY DATE(DATETIME(snapshot_timestamp, "America/Los_Angeles")), campaign_id 
-                    ORDER BY snapshot_timestamp DESC
-                ) as rn
-            FROM `{project_id}.{dataset_id}.meta_campaign_snapshots`
-            WHERE DATE(DATETIME(snapshot_timestamp, "America/Los_Angeles")) BETWEEN '{start_date}' AND '{end_date}'
-            {account_filter}
-        )
-        SELECT 
-            date,
-            SUM(CASE WHEN budget_type = 'daily' THEN budget_amount ELSE 0 END) as total_daily_budget,
-            SUM(CASE WHEN budget_type = 'lifetime' THEN budget_amount ELSE 0 END) as total_lifetime_budget,
-            COUNT(DISTINCT CASE WHEN budget_type = 'daily' THEN campaign_id END) as daily_campaign_count,
-            COUNT(DISTINCT CASE WHEN budget_type = 'lifetime' THEN campaign_id END) as lifetime_campaign_count
-        FROM daily_latest
-        WHERE rn = 1
-        GROUP BY date
-        ORDER BY date
-        """
-        
-        trends_df = client.query(trends_query).to_dataframe()
+        trends_df = page_results["trends"].result()
         
         if len(trends_df) > 0:
-            # Create dual-axis trend chart
+            # Create dual-axis trend chart - trends_query returns one row per day,
+            # so the series is bounded by the date range, not by snapshot cadence
             fig = go.Figure()
+            # Plain arrays skip Plotly's per-trace Series/index handling
+            trend_dates = trends_df['date'].to_numpy()
             
             # Daily budget on primary y-axis
             fig.add_trace(go.Scatter(
-                x=trends_df['date'],
-                y=trends_df['total_daily_budget'],
+                x=trend_dates,
+                y=trends_df['total_daily_budget'].to_numpy(dtype=float),
                 mode='lines+markers',
                 name='Total Daily Budget',
                 line=dict(color='#4da3ff', width=3),
                 marker=dict(size=8, color='#4da3ff'),
                 hovertemplate='Date: %{x}<br>Daily Budget: $%{y:,.0f}<br>Campaigns: %{customdata}<extra></extra>',
-                customdata=trends_df['daily_campaign_count'],
+                customdata=trends_df['daily_campaign_count'].to_numpy(),
                 yaxis='y'
             ))
             
             # Lifetime budget on secondary y-axis
             fig.add_trace(go.Scatter(
-                x=trends_df['date'],
-                y=trends_df['total_lifetime_budget'],
+                x=trend_dates,
+                y=trends_df['total_lifetime_budget'].to_numpy(dtype=float),
                 mode='lines+markers',
                 name='Total Lifetime Budget',
                 line=dict(color='#ff6b6b', width=3),
                 marker=dict(size=8, color='#ff6b6b'),
                 hovertemplate='Date: %{x}<br>Lifetime Budget: $%{y:,.0f}<br>Campaigns: %{customdata}<extra></extra>',
-                customdata=trends_df['lifetime_campaign_count'],
+                customdata=trends_df['lifetime_campaign_count'].to_numpy(),
                 yaxis='y2'
             ))
             
@@ -1624,20 +1174,10 @@ with tab2:
                     overlaying='y',
                     side='right'
                 ),
-                template="plotly_dark",
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='#fafafa'),
-                title_font=dict(size=20, color='#4da3ff'),
-                hovermode='x unified',
+                **COMMON_LAYOUT,
+                hovermode=trend_hovermode(len(trends_df)),
                 margin=dict(l=0, r=60, t=40, b=0),
-                legend=dict(
-                    yanchor="top",
-                    y=0.99,
-                    xanchor="left",
-                    x=0.01,
-                    bgcolor="rgba(0,0,0,0.5)"
-                )
+                legend=COMMON_LEGEND
             )
             
             st.plotly_chart(fig, use_container_width=True)
@@ -1647,100 +1187,10 @@ with tab2:
         # Lifetime budget analysis (different visualization)
         st.markdown("#### Lifetime Budget Campaigns - Analysis")
         
-        lifetime_query = f"""
-        WITH latest AS (
-            SELECT 
-                campaign_id,
-                campaign_name,
-                account_name,
-                budget_amount,
-                created_time,
-                start_time,
-                stop_time,
-                ROW_NUMBER() OVER (PARTITION BY campaign_id ORDER BY snapshot_timestamp DESC) as rn
-            FROM `{project_id}.{dataset_id}.meta_campaign_snapshots`
-            WHERE budget_type = 'lifetime'
-            AND DATE(snapshot_timestamp) = CURRENT_DATE()
-            {account_filter}
-        )
-        SELECT 
-            campaign_id,
-            campaign_name,
-            account_name,
-            budget_amount,
-            created_time,
-            start_time,
-            stop_time,
-            CASE 
-                WHEN stop_time IS NOT NULL THEN DATE_DIFF(DATE(stop_time), DATE(start_time), DAY)
-                ELSE DATE_DIFF(CURRENT_DATE(), DATE(start_time), DAY)
-            END as campaign_duration_days
-        FROM latest
-        WHERE rn = 1
-        ORDER BY budget_amount DESC
-        LIMIT 20
-        """
-        
-        lifetime_df = client.query(lifetime_query).to_dataframe()
+        lifetime_df = page_results["lifetime"].result()
         
         if len(lifetime_df) > 0:
-            # Calculate effective daily budget for lifetime campaigns
-            lifetime_df['effective_daily_budget'] = lifetime_df.apply(
-                lambda row: row['budget_amount'] / max(row['campaign_duration_days'], 1) if row['campaign_duration_days'] > 0 else row['budget_amount'] / 30,
-                axis=1
-            )
-            
-            # Show top lifetime budget campaigns with their effective daily spend
-            fig2 = go.Figure()
-            
-            # Bar chart showing lifetime budgets and effective daily
-            fig2.add_trace(go.Bar(
-                x=lifetime_df['campaign_name'][:10],
-                y=lifetime_df['budget_amount'][:10],
-                name='Lifetime Budget',
-                marker_color='#ff6b6b',
-                hovertemplate='%{x}<br>Lifetime: $%{y:,.0f}<extra></extra>'
-            ))
-            
-            fig2.add_trace(go.Bar(
-                x=lifetime_df['campaign_name'][:10],
-                y=lifetime_df['effective_daily_budget'][:10],
-                name='Effective Daily',
-                marker_color='#4da3ff',
-                hovertemplate='%{x}<br>Daily: $%{y:,.0f}<extra></extra>',
-                yaxis='y2'
-            ))
-            
-            fig2.update_layout(
-                title="Top 10 Lifetime Budget Campaigns",
-                xaxis_title="Campaign",
-                yaxis_title="Lifetime Budget ($)",
-                yaxis2=dict(
-                    title="Effective Daily Budget ($)",
-                    overlaying='y',
-                    side='right',
-                    showgrid=False
-                ),
-                template="plotly_dark",
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='#fafafa'),
-                title_font=dict(size=20, color='#4da3ff'),
-                margin=dict(l=0, r=60, t=40, b=100),
-                xaxis={'tickangle': -45},
-                hovermode='x unified',
-                barmode='group',
-                legend=dict(
-                    yanchor="top",
-                    y=0.99,
-                    xanchor="left",
-                    x=0.01,
-                    bgcolor="rgba(0,0,0,0.5)"
-                )
-            )
-            
-            st.plotly_chart(fig2, use_container_width=True)
-            
+            st.plotly_chart(build_lifetime_fig(lifetime_df), use_container_width=True)
         else:
             st.info("No lifetime budget campaigns found")
             
@@ -1748,78 +1198,10 @@ with tab2:
         if not selected_accounts:
             st.markdown("### Top 10 Accounts by Budget Type")
             
-            top_accounts_query = f"""
-            WITH latest AS (
-                SELECT 
-                    account_name,
-                    campaign_id,
-                    budget_amount,
-                    budget_type,
-                    ROW_NUMBER() OVER (PARTITION BY campaign_id ORDER BY snapshot_timestamp DESC) as rn
-                FROM `{project_id}.{dataset_id}.meta_campaign_snapshots`
-                WHERE DATE(DATETIME(snapshot_timestamp, "America/Los_Angeles")) = CURRENT_DATE("America/Los_Angeles")
-            )
-            SELECT 
-                account_name,
-                SUM(CASE WHEN budget_type = 'daily' THEN budget_amount ELSE 0 END) as daily_budget,
-                SUM(CASE WHEN budget_type = 'lifetime' THEN budget_amount ELSE 0 END) as lifetime_budget,
-                COUNT(DISTINCT CASE WHEN budget_type = 'daily' THEN campaign_id END) as daily_campaigns,
-                COUNT(DISTINCT CASE WHEN budget_type = 'lifetime' THEN campaign_id END) as lifetime_campaigns
-            FROM latest
-            WHERE rn = 1
-            GROUP BY account_name
-            ORDER BY (daily_budget + lifetime_budget/30) DESC
-            LIMIT 10
-            """
-            
-            top_df = client.query(top_accounts_query).to_dataframe()
+            top_df = page_results["top_accounts"].result()
             
             if len(top_df) > 0:
-                # Create stacked bar chart
-                fig3 = go.Figure()
-                
-                fig3.add_trace(go.Bar(
-                    y=top_df['account_name'],
-                    x=top_df['daily_budget'],
-                    name='Daily Budget',
-                    orientation='h',
-                    marker_color='#4da3ff',
-                    hovertemplate='%{y}<br>Daily: $%{x:,.0f}<br>Campaigns: %{customdata}<extra></extra>',
-                    customdata=top_df['daily_campaigns']
-                ))
-                
-                fig3.add_trace(go.Bar(
-                    y=top_df['account_name'],
-                    x=top_df['lifetime_budget']/30,  # Show as daily equivalent
-                    name='Lifetime (÷30)',
-                    orientation='h',
-                    marker_color='#ff6b6b',
-                    hovertemplate='%{y}<br>Lifetime÷30: $%{x:,.0f}<br>Total Lifetime: $%{customdata:,.0f}<extra></extra>',
-                    customdata=top_df['lifetime_budget']
-                ))
-                
-                fig3.update_layout(
-                    title="Top Accounts by Estimated Daily Spend",
-                    xaxis_title="Estimated Daily Spend ($)",
-                    yaxis_title="Account",
-                    template="plotly_dark",
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    font=dict(color='#fafafa'),
-                    margin=dict(l=0, r=0, t=40, b=0),
-                    xaxis=dict(gridcolor='#2d3748'),
-                    yaxis=dict(gridcolor='#2d3748'),
-                    barmode='stack',
-                    legend=dict(
-                        yanchor="top",
-                        y=0.99,
-                        xanchor="right",
-                        x=0.99,
-                        bgcolor="rgba(0,0,0,0.5)"
-                    )
-                )
-                
-                st.plotly_chart(fig3, use_container_width=True)
+                st.plotly_chart(build_top_accounts_fig(top_df), use_container_width=True)
         else:
             st.info("No trend data available for the selected period")
     except Exception as e:
@@ -1830,30 +1212,15 @@ with tab3:
     st.markdown("### Anomaly Detection History")
     
     try:
-        anomalies_query = f"""
-        SELECT 
-            detected_at,
-            anomaly_type,
-            account_name,
-            campaign_name,
-            message,
-            current_budget,
-            risk_score
-        FROM `{project_id}.{dataset_id}.meta_anomalies`
-        WHERE DATE(detected_at) BETWEEN '{start_date}' AND '{end_date}'
-        {account_filter}
-        ORDER BY detected_at DESC
-        LIMIT 50
-        """
-        
-        anomalies_df = client.query(anomalies_query).to_dataframe()
+        anomalies_df = page_results["anomalies"].result()
         
         if len(anomalies_df) > 0:
             # Anomaly statistics
             col1, col2, col3 = st.columns(3)
             
-            critical_count = len(anomalies_df[anomalies_df['anomaly_type'] == 'CRITICAL'])
-            warning_count = len(anomalies_df[anomalies_df['anomaly_type'] == 'WARNING'])
+            type_counts = anomalies_df['anomaly_type'].value_counts()
+            critical_count = int(type_counts.get('CRITICAL', 0))
+            warning_count = int(type_counts.get('WARNING', 0))
             avg_risk = anomalies_df['risk_score'].mean()
             
             with col1:
@@ -1867,25 +1234,36 @@ with tab3:
             
             st.markdown("---")
             
-            # Display anomalies
-            for _, anomaly in anomalies_df.iterrows():
-                alert_class = "alert-critical" if anomaly['anomaly_type'] == 'CRITICAL' else "alert-warning"
-                
-                st.markdown(f"""
-                <div class="alert-box {alert_class}">
-                    <strong>{anomaly['anomaly_type']}</strong> - {anomaly['account_name']} - {anomaly['campaign_name']}<br>
-                    <span style="color: #94a3b8;">{anomaly['message']}</span><br>
-                    <small style="color: #64748b;">Detected: {anomaly['detected_at'].strftime('%Y-%m-%d %H:%M')} | Risk Score: {anomaly['risk_score']:.1f}</small>
-                </div>
-                """, unsafe_allow_html=True)
+            # Display anomalies - all cards go out in a single markdown element
+            alert_classes = np.where(
+                anomalies_df['anomaly_type'].eq('CRITICAL').to_numpy(dtype=bool, na_value=False),
+                'alert-critical', 'alert-warning'
+            )
+            detected_labels = anomalies_df['detected_at'].dt.strftime('%Y-%m-%d %H:%M').to_numpy()
+            anomaly_cards = [
+                ANOMALY_CARD_TEMPLATE.format(
+                    alert_class=alert_class,
+                    anomaly_type=anomaly.anomaly_type,
+                    account_name=anomaly.account_name,
+                    campaign_name=anomaly.campaign_name,
+                    message=anomaly.message,
+                    detected=detected,
+                    risk_score=anomaly.risk_score
+                )
+                for alert_class, detected, anomaly in zip(alert_classes, detected_labels, anomalies_df.itertuples(index=False))
+            ]
+            st.markdown("".join(anomaly_cards), unsafe_allow_html=True)
         else:
             st.markdown("""
             <div class="success-message">
                 ✅ No anomalies detected in the selected period!
             </div>
             """, unsafe_allow_html=True)
-    except:
+    except NotFound:
+        # meta_anomalies is created by the monitor on its first detection
         st.info("Anomaly data will appear here once the monitoring system detects any budget anomalies.")
+    except Exception as e:
+        st.error(f"Error loading anomalies: {str(e)}")
 
 # Tab 4: Delivery Issues
 with tab4:
@@ -1895,6 +1273,8 @@ with tab4:
     - No active ad sets
     - Ad sets without ads
     - All ads paused or disapproved
+    
+    Campaigns that haven't started yet (⏰) or whose delivery check failed (❌) are not counted.
     """)
     
     # Zombie campaign detection info box
@@ -1907,79 +1287,36 @@ with tab4:
     
     # Show campaigns with delivery issues
     try:
-        zombie_query = f"""
-        WITH latest AS (
-            SELECT 
-                account_name,
-                campaign_id,
-                campaign_name,
-                budget_amount,
-                budget_type,
-                created_time,
-                delivery_status_simple,
-                total_adsets,
-                active_adsets,
-                adsets_with_active_ads,
-                ROW_NUMBER() OVER (PARTITION BY campaign_id ORDER BY snapshot_timestamp DESC) as rn
-            FROM `{project_id}.{dataset_id}.meta_campaign_snapshots`
-            WHERE DATE(DATETIME(snapshot_timestamp, "America/Los_Angeles")) = CURRENT_DATE("America/Los_Angeles")
-            AND campaign_status = 'ACTIVE'
-            {account_filter}
-        )
-        SELECT * FROM latest 
-        WHERE rn = 1
-            AND delivery_status_simple NOT LIKE '🟢%'
-            AND delivery_status_simple NOT LIKE '❓%'
-            AND budget_amount >= {min_budget}
-        ORDER BY budget_amount DESC
-        LIMIT 50
-        """
-        
-        zombie_df = client.query(zombie_query).to_dataframe()
+        zombie_df = page_results["zombies"].result()
         
         if len(zombie_df) > 0:
-            # Group by issue type
-            critical_zombies = zombie_df[zombie_df['delivery_status_simple'].str.contains('🔴')]
-            warning_zombies = zombie_df[zombie_df['delivery_status_simple'].str.contains('🟠')]
-            medium_zombies = zombie_df[zombie_df['delivery_status_simple'].str.contains('🟡')]
+            # Group by issue type (delivery_severity: 4 = no ad sets, 3 = ad sets paused, 2 = no active ads)
+            severity_groups = dict(tuple(zombie_df.groupby('delivery_severity', sort=False)))
+            no_zombies = zombie_df.iloc[0:0]
+            critical_zombies = severity_groups.get(4, no_zombies)
+            warning_zombies = severity_groups.get(3, no_zombies)
+            medium_zombies = severity_groups.get(2, no_zombies)
             
-            total_daily_waste = zombie_df[zombie_df['budget_type'] == 'daily']['budget_amount'].sum()
+            total_zombies = int(zombie_df['total_zombies'].iloc[0])
+            total_daily_waste = zombie_df['total_daily_waste'].iloc[0] or 0
             
-            st.error(f"🧟 Found {len(zombie_df)} zombie campaigns with ${total_daily_waste:,.2f} daily budget at risk!")
+            st.error(f"🧟 Found {total_zombies} zombie campaigns with ${total_daily_waste:,.2f} daily budget at risk!")
             
             # Display by severity
             if len(critical_zombies) > 0:
                 st.markdown("### 🔴 Critical - No Ad Sets")
-                for _, campaign in critical_zombies.iterrows():
-                    st.markdown(f"""
-                    <div class="alert-box alert-critical">
-                        <strong>{campaign['campaign_name']}</strong> - {campaign['account_name']}<br>
-                        <span style="color: #ef4444; font-weight: bold;">Budget: ${campaign['budget_amount']:,.2f} {campaign['budget_type']}</span><br>
-                        <span style="color: #94a3b8;">{campaign['delivery_status_simple']} | {campaign['total_adsets']} total ad sets</span>
-                    </div>
-                    """, unsafe_allow_html=True)
+                render_zombie_cards(critical_zombies, "alert-critical", "#ef4444",
+                                    lambda campaign: f"{campaign.total_adsets} total ad sets")
             
             if len(warning_zombies) > 0:
                 st.markdown("### 🟠 High Risk - Ad Sets Paused")
-                for _, campaign in warning_zombies.iterrows():
-                    st.markdown(f"""
-                    <div class="alert-box alert-warning">
-                        <strong>{campaign['campaign_name']}</strong> - {campaign['account_name']}<br>
-                        <span style="color: #f59e0b; font-weight: bold;">Budget: ${campaign['budget_amount']:,.2f} {campaign['budget_type']}</span><br>
-                        <span style="color: #94a3b8;">{campaign['delivery_status_simple']} | {campaign['active_adsets']}/{campaign['total_adsets']} ad sets active</span>
-                    </div>
-                    """, unsafe_allow_html=True)
+                render_zombie_cards(warning_zombies, "alert-warning", "#f59e0b",
+                                    lambda campaign: f"{campaign.active_adsets}/{campaign.total_adsets} ad sets active")
             
             if len(medium_zombies) > 0:
                 st.markdown("### 🟡 Medium Risk - No Active Ads")
-                for _, campaign in medium_zombies.iterrows():
-                    st.markdown(f"""
-                    <div class="alert-box alert-info">
-                        <strong>{campaign['campaign_name']}</strong> - {campaign['account_name']}<br>
-                        <span style="color: #4da3ff; font-weight: bold;">Budget: ${campaign['budget_amount']:,.2f} {campaign['budget_type']}</span><br>
-                        <span style="color: #94a3b8;">{campaign['delivery_status_simple']} | {campaign['adsets_with_active_ads']}/{campaign['active_adsets']} ad sets have ads</span>
-                    </div>
-                    """, unsafe_allow_html=True)
+                render_zombie_cards(medium_zombies, "alert-info", "#4da3ff",
+                                    lambda campaign: f"{campaign.adsets_with_active_ads}/{campaign.active_adsets} ad sets have ads")
             
             # Recommendations
             st.markdown("### 📋 Recommended Actions")
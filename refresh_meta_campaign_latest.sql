@@ -0,0 +1,21 @@
+-- Scheduled refresh for the dashboard's meta_campaign_latest table (created by add_delivery_columns.sql)
+-- Rebuilds only yesterday and today (PST), so late snapshots around midnight are picked up.
+-- Run every 15 minutes as a BigQuery scheduled query - create it in the console
+-- (BigQuery > Scheduled queries) or from the command line:
+--   bq query --use_legacy_sql=false --display_name="meta_campaign_latest refresh" \
+--     --schedule="every 15 minutes" --location=US "$(cat refresh_meta_campaign_latest.sql)"
+-- The dashboard's header freshness reads MAX(snapshot_timestamp) from this table, so it shows
+-- the age of the data on screen rather than of the raw snapshots
+
+BEGIN TRANSACTION;
+
+DELETE FROM `generative-ai-418805.budget_alert.meta_campaign_latest`
+WHERE snapshot_date >= DATE_SUB(CURRENT_DATE("America/Los_Angeles"), INTERVAL 1 DAY);
+
+INSERT INTO `generative-ai-418805.budget_alert.meta_campaign_latest`
+SELECT *
+FROM `generative-ai-418805.budget_alert.meta_campaign_latest_since`(
+    DATE_SUB(CURRENT_DATE("America/Los_Angeles"), INTERVAL 1 DAY)
+);
+
+COMMIT TRANSACTION;